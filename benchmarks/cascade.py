@@ -0,0 +1,63 @@
+"""
+PER / throughput trade-off of CascadeMWL confidence thresholds, with the fraction of words handled by every stage
+
+PER is measured on the gold words (lookup_word=False), throughput and stage fractions on
+distinct generated words, as out of vocabulary words in production. Every gate of the
+cascade uses the same threshold, the engines alone are listed first.
+
+    python -m benchmarks.cascade [--stages CRFOrthoCorrector CRFEspeakCorrector] [--thresholds 0.3 0.5 0.7 0.9]
+"""
+import argparse
+import time
+
+import mwl_phonemizer
+from mwl_phonemizer.cascade import CascadeMWL
+from mwl_phonemizer.epitran_transducer import generated_words
+
+
+def per(pho, gold: dict[str, str]) -> tuple[float, float]:
+    """(PER, stress-agnostic PER) over the gold words"""
+    phonemes = pho.phonemize_words(list(gold), lookup_word=False)
+    errors = sum(pho.word_edit_distance(p, g) for p, g in zip(phonemes, gold.values()))
+    errors_no_stress = sum(pho.word_edit_distance(pho.strip_stress(p), pho.strip_stress(g))
+                           for p, g in zip(phonemes, gold.values()))
+    return (errors / sum(len(g) for g in gold.values()),
+            errors_no_stress / sum(len(pho.strip_stress(g)) for g in gold.values()))
+
+
+def words_per_sec(pho, words: list[str]) -> float:
+    start = time.perf_counter()
+    pho.phonemize_words(words)
+    return len(words) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--stages", nargs="+", default=["CRFOrthoCorrector", "CRFEspeakCorrector"],
+                        help="engines, cheapest first")
+    parser.add_argument("--thresholds", nargs="+", type=float, default=[0.3, 0.5, 0.7, 0.9])
+    parser.add_argument("--words", type=int, default=20000, help="generated words for throughput")
+    args = parser.parse_args()
+
+    try:
+        engines = [getattr(mwl_phonemizer, name)(cache_size=0) for name in args.stages]
+        engines[-1].phonemize_words(["lhéngua"], lookup_word=False)
+    except (ImportError, RuntimeError) as e:
+        raise SystemExit(f"cannot build the stages: {e}")
+    gold = engines[0].GOLD
+    words = list(dict.fromkeys(w.lower() for w in generated_words(args.words * 2)
+                               if w.isalpha() and w.lower() not in gold))[:args.words]
+
+    stage_names = " / ".join(name[:12] for name in ["GOLD", *args.stages])
+    print(f"{'':<26} | {'PER':>6} | {'PER no stress':>13} | {'words/sec':>9} | {stage_names}")
+    print("-" * 110)
+    for name, engine in zip(args.stages, engines):
+        full, no_stress = per(engine, gold)
+        print(f"{name:<26} | {full:>6.2%} | {no_stress:>13.2%} | {words_per_sec(engine, words):>9.0f} |")
+    for threshold in args.thresholds:
+        cascade = CascadeMWL([(engine, threshold) for engine in engines[:-1]] + [(engines[-1], None)], cache_size=0)
+        full, no_stress = per(cascade, gold)
+        cascade.reset_stats()
+        wps = words_per_sec(cascade, words)
+        fractions = " / ".join(f"{stats['fraction']:.0%}" for stats in cascade.stage_stats())
+        print(f"{f'cascade, threshold {threshold}':<26} | {full:>6.2%} | {no_stress:>13.2%} | {wps:>9.0f} | {fractions}")
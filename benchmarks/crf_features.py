@@ -0,0 +1,54 @@
+"""
+per word CRF inference time: feature dicts (old) vs preformatted crfsuite attributes, cold and memoized
+
+Checks first that both give identical predictions on the transformed gold words.
+
+    python -m benchmarks.crf_features [--engines CRFPhonemizer CRFOrthoCorrector] [--repeat 20]
+"""
+import argparse
+import time
+
+import mwl_phonemizer
+
+
+def us_per_word(func, words: list[str]) -> float:
+    start = time.perf_counter()
+    for word in words:
+        func(word)
+    return (time.perf_counter() - start) / len(words) * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--engines", nargs="+", default=["CRFPhonemizer", "CRFOrthoCorrector",
+                                                          "CRFEspeakCorrector", "CRFEpitranCorrector"])
+    parser.add_argument("--repeat", type=int, default=20, help="passes over the gold words")
+    args = parser.parse_args()
+
+    print(f"{'Engine':<20} | {'dicts':>9} | {'attributes':>10} | {'memoized':>9} | speedup")
+    print("-" * 72)
+    for engine in args.engines:
+        try:
+            pho = getattr(mwl_phonemizer, engine)()
+            words = pho.grapheme_transforms_many(list(pho.GOLD))
+        except (ImportError, RuntimeError) as e:
+            print(f"{engine:<20} | skipped: {e}")
+            continue
+        tagger = pho.tagger()
+
+        def old(tx_word):
+            return tagger.tag(pho.extract_features(tx_word))
+
+        def new(tx_word):
+            return tagger.tag(pho.item_sequence(tx_word))
+
+        feature_cache, pho.feature_cache = pho.feature_cache, None  # every word formatted again
+        mismatches = [w for w in words if old(w) != new(w)]
+        assert not mismatches, f"{engine} predictions differ for {mismatches[:10]}"
+        corpus = words * args.repeat
+        old_us = us_per_word(old, corpus)
+        cold_us = us_per_word(new, corpus)
+        pho.feature_cache = feature_cache
+        memoized_us = us_per_word(new, corpus)
+        print(f"{engine:<20} | {old_us:>7.1f}us | {cold_us:>8.1f}us | {memoized_us:>7.1f}us | "
+              f"{old_us / cold_us:.2f}x / {old_us / memoized_us:.2f}x")
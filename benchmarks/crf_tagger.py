@@ -0,0 +1,56 @@
+"""
+words/sec of CRF phonemization with the native pycrfsuite tagger: per word, phonemize_many and phonemize_many on several threads
+
+Grapheme transforms are included, phonemize_many batches them. Checks that all paths, and
+phonemize_many split over several threads, give identical output.
+
+    python -m benchmarks.crf_tagger [--engines CRFPhonemizer CRFOrthoCorrector] [--words 20000] [--threads 4]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mwl_phonemizer
+from mwl_phonemizer.epitran_transducer import generated_words
+
+
+def words_per_sec(func, words: list[str]) -> tuple[list[str], float]:
+    start = time.perf_counter()
+    out = func(words)
+    return out, len(words) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--engines", nargs="+", default=["CRFPhonemizer", "CRFOrthoCorrector",
+                                                          "CRFEspeakCorrector", "CRFEpitranCorrector"])
+    parser.add_argument("--words", type=int, default=20000, help="generated words, every one distinct")
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    words = list(dict.fromkeys(w.lower() for w in generated_words(args.words * 2) if w.isalpha()))[:args.words]
+    print(f"{'Engine':<20} | {'per word':>10} | {'phonemize_many':>14} | {'threads':>10}")
+    print("-" * 65)
+    for engine in args.engines:
+        try:
+            pho = getattr(mwl_phonemizer, engine)(feature_cache_size=0)
+            pho.phonemize_many(words[:10], lookup_word=False)
+        except (ImportError, RuntimeError) as e:
+            print(f"{engine:<20} | skipped: {e}")
+            continue
+
+        def threaded(batch):
+            chunks = [batch[i::args.threads] for i in range(args.threads)]
+            with ThreadPoolExecutor(args.threads) as pool:
+                outs = list(pool.map(lambda chunk: pho.phonemize_many(chunk, lookup_word=False), chunks))
+            merged = [""] * len(batch)
+            for i, out in enumerate(outs):
+                merged[i::args.threads] = out
+            return merged
+
+        per_word, per_word_wps = words_per_sec(lambda batch: [pho.phonemize(w, lookup_word=False) for w in batch],
+                                               words)
+        many, many_wps = words_per_sec(lambda batch: pho.phonemize_many(batch, lookup_word=False), words)
+        parallel, threads_wps = words_per_sec(threaded, words)
+        assert per_word == many == parallel, f"{engine} outputs differ"
+        print(f"{engine:<20} | {per_word_wps:>10.0f} | {many_wps:>14.0f} | {threads_wps:>10.0f}")
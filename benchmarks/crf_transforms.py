@@ -0,0 +1,42 @@
+"""
+cost of transforming the gold words for CRF training: per word, batched and from the registry cache
+
+    python -m benchmarks.crf_transforms [--engines CRFEspeakCorrector CRFEpitranCorrector]
+"""
+import argparse
+import tempfile
+import time
+
+import mwl_phonemizer
+from mwl_phonemizer.model_registry import ModelRegistry
+
+
+def seconds(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--engines", nargs="+", default=["CRFEspeakCorrector", "CRFEpitranCorrector"])
+    args = parser.parse_args()
+
+    print(f"{'Engine':<20} | {'per word':>9} | {'batched':>9} | {'cached':>9}")
+    print("-" * 56)
+    for engine in args.engines:
+        cls = getattr(mwl_phonemizer, engine)
+        try:
+            # a single training pair, only the transforms are measured
+            pho = cls(crf_model_path=None, use_model_registry=False, train_data=[("a", "a")])
+            words = list(pho.GOLD)
+            pho.grapheme_transforms(words[0])  # warm up, loads espeak / epitran
+        except (ImportError, RuntimeError) as e:
+            print(f"{engine:<20} | skipped: {e}")
+            continue
+        with tempfile.TemporaryDirectory() as cache_dir:
+            registry = ModelRegistry(cache_dir)
+            per_word = seconds(lambda: [pho.grapheme_transforms(word) for word in words])
+            batched = seconds(lambda: pho._transform_gold(words, registry))
+            cached = seconds(lambda: pho._transform_gold(words, registry))
+        print(f"{engine:<20} | {per_word:>8.3f}s | {batched:>8.3f}s | {cached:>8.3f}s")
@@ -0,0 +1,60 @@
+"""
+words/sec of epitran transliteration on a corpus with repeated words: raw epitran, memoized and precomputed table
+
+    python -m benchmarks.epitran_cache [--words 20000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from mwl_phonemizer.base import MirandesePhonemizer
+from mwl_phonemizer.epitran_mwl import _EpitranTransliterator
+
+
+def timed(func):
+    start = time.perf_counter()
+    out = func()
+    return out, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--words", type=int, default=20000, help="corpus size, zipf distributed over the gold words")
+    args = parser.parse_args()
+
+    try:
+        import epitran
+    except ImportError:
+        raise SystemExit("epitran is not installed")
+
+    vocab = list(MirandesePhonemizer().GOLD)
+    weights = [1 / rank for rank in range(1, len(vocab) + 1)]
+    corpus = random.Random(0).choices(vocab, weights, k=args.words)
+
+    raw, load = timed(lambda: epitran.Epitran("por-Latn"))
+    print(f"{len(corpus)} words, {len(set(corpus))} unique, epitran loads in {load:.2f}s\n")
+
+    expected, seconds = timed(lambda: [raw.transliterate(word) for word in corpus])
+    print(f"{'epitran':<22} | {len(corpus) / seconds:>10.0f} words/sec")
+
+    memo = _EpitranTransliterator("por-Latn", use_transducer=False)
+    memo._epitran = raw  # already loaded
+    out, seconds = timed(lambda: [memo.transliterate(word) for word in corpus])
+    assert out == expected
+    print(f"{'memoized, per word':<22} | {len(corpus) / seconds:>10.0f} words/sec")
+
+    memo = _EpitranTransliterator("por-Latn", use_transducer=False)
+    memo._epitran = raw
+    out, seconds = timed(lambda: memo.transliterate_many(corpus))
+    assert out == expected
+    print(f"{'transliterate_many':<22} | {len(corpus) / seconds:>10.0f} words/sec")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "table.json")
+        memo.save_table(path, vocab)
+        table, load = timed(lambda: _EpitranTransliterator("por-Latn", table_path=path))
+        out, seconds = timed(lambda: table.transliterate_many(corpus))
+    assert out == expected and table._epitran is None
+    print(f"{'precomputed table':<22} | {len(corpus) / seconds:>10.0f} words/sec, loads in {load * 1000:.1f}ms")
@@ -0,0 +1,59 @@
+"""
+startup time and words/sec of the compiled por-Latn EpitranTransducer vs epitran.Epitran
+
+Checks first that both transliterate the gold vocabulary and the generated words identically.
+Startup is measured in fresh interpreters, imports included.
+
+    python -m benchmarks.epitran_transducer [--words 50000] [--startup-runs 3]
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+from mwl_phonemizer.base import MirandesePhonemizer
+from mwl_phonemizer.epitran_transducer import EpitranTransducer, generated_words
+
+STARTUP = {
+    "epitran.Epitran": "import epitran; pho = epitran.Epitran('por-Latn')",
+    "EpitranTransducer": "from mwl_phonemizer.epitran_transducer import EpitranTransducer; "
+                         "pho = EpitranTransducer.load()",
+}
+
+
+def startup_seconds(statement: str, runs: int) -> float:
+    code = f"import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)"
+    return min(float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                    check=True).stdout) for _ in range(runs))
+
+
+def words_per_sec(func, words: list[str]) -> float:
+    start = time.perf_counter()
+    for word in words:
+        func(word)
+    return len(words) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--words", type=int, default=50000, help="generated words")
+    parser.add_argument("--startup-runs", type=int, default=3)
+    args = parser.parse_args()
+
+    import epitran
+
+    pho = MirandesePhonemizer()
+    gold = list(dict.fromkeys([*pho.GOLD, *pho.RAIANO_GOLD, *pho.SENDINESE_GOLD]))
+    words = generated_words(args.words)
+    transducer = EpitranTransducer.load()
+    reference = epitran.Epitran("por-Latn")
+    mismatches = transducer.verify(gold + words)
+    assert not mismatches, f"transducer differs from epitran for {mismatches[:10]}"
+    print(f"{len(gold) + len(words)} words identical to epitran {transducer.epitran_version}\n")
+
+    print(f"{'':<18} | {'startup':>9} | {'gold words/sec':>14} | {'generated words/sec':>19}")
+    print("-" * 70)
+    for name, func in (("epitran.Epitran", reference.transliterate), ("EpitranTransducer", transducer.transliterate)):
+        startup = startup_seconds(STARTUP[name], args.startup_runs)
+        print(f"{name:<18} | {startup * 1000:>7.1f}ms | {words_per_sec(func, gold * 20):>14.0f} | "
+              f"{words_per_sec(func, words):>19.0f}")
@@ -0,0 +1,48 @@
+"""
+words/sec of the _EspeakPhonemizer backends: in-process libespeak-ng, persistent workers and a subprocess per word
+
+    python -m benchmarks.espeak_backends [--library /path/to/libespeak-ng.so] [--data-path /path/to/espeak-ng-data]
+"""
+import argparse
+import time
+
+from mwl_phonemizer.base import MirandesePhonemizer
+from mwl_phonemizer.espeak_mwl import _EspeakPhonemizer, EspeakError
+
+
+def bench(pho: _EspeakPhonemizer, words: list[str], lang: str, batched: bool) -> float:
+    start = time.perf_counter()
+    if batched:
+        pho.phonemize_many(words, lang)
+    else:
+        for word in words:
+            pho.phonemize_string(word, lang)
+    return len(words) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--library", help="path to libespeak-ng.so, found automatically by default")
+    parser.add_argument("--data-path", help="path to espeak-ng-data")
+    parser.add_argument("--lang", default="pt-PT")
+    parser.add_argument("--repeat", type=int, default=5, help="passes over the gold vocabulary")
+    args = parser.parse_args()
+
+    vocab = list(MirandesePhonemizer().GOLD)
+    words = vocab * args.repeat
+
+    print(f"{len(words)} words ({len(vocab)} unique)\n")
+    print(f"{'Backend':<12} | {'Mode':<10} | {'words/sec':>10}")
+    print("-" * 38)
+    for backend in ("library", "worker", "subprocess"):
+        pho = _EspeakPhonemizer(backend=backend, library_path=args.library, data_path=args.data_path)
+        try:
+            pho.phonemize_string(vocab[0], args.lang)  # warm up, loads the library / starts the worker
+        except EspeakError as e:
+            print(f"{backend:<12} | skipped: {e}")
+            continue
+        # a subprocess per word is slow, a single pass is enough
+        sample = vocab if backend == "subprocess" else words
+        for batched in (False, True):
+            wps = bench(pho, sample, args.lang, batched)
+            print(f"{backend:<12} | {'batch' if batched else 'per word':<10} | {wps:>10.0f}")
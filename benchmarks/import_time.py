@@ -0,0 +1,55 @@
+"""
+import cost of the package entry points, measured with `python -X importtime` in fresh interpreters
+
+    python -m benchmarks.import_time [--repeat 5]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("sklearn_crfsuite", "joblib", "Levenshtein", "editdistance", "epitran")
+
+STATEMENTS = {
+    "interpreter startup": "pass",
+    "import mwl_phonemizer": "import mwl_phonemizer",
+    "OrthographyRulesMWL": "from mwl_phonemizer import OrthographyRulesMWL",
+    "LookupTableMWL": "from mwl_phonemizer import LookupTableMWL",
+    "NgramMWLPhonemizer": "from mwl_phonemizer import NgramMWLPhonemizer",
+    "cli": "import mwl_phonemizer.cli",
+    "CRFPhonemizer": "from mwl_phonemizer import CRFPhonemizer",
+    "all engines": "from mwl_phonemizer import *",
+    # what `import mwl_phonemizer` used to cost, before engines and their dependencies were lazy
+    "eager (old)": "from mwl_phonemizer import *; " + "; ".join(f"import {m}" for m in HEAVY_MODULES[:4]),
+}
+
+
+def import_time(stmt: str) -> tuple[float, list[str]]:
+    """returns (total import time in ms, heavy modules that got imported)"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", stmt],
+                          capture_output=True, text=True, check=True)
+    total_us = 0
+    loaded = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name[1:].startswith(" "):  # top level import, cumulative covers its children
+            total_us += int(cumulative)
+        name = name.strip()
+        if name.split(".")[0] in HEAVY_MODULES:
+            loaded.add(name.split(".")[0])
+    return total_us / 1000, sorted(loaded)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per statement, median is reported")
+    args = parser.parse_args()
+
+    print(f"{'Entry point':<22} | {'import ms':>10} | heavy modules loaded")
+    print("-" * 72)
+    for label, stmt in STATEMENTS.items():
+        runs = [import_time(stmt) for _ in range(args.repeat)]
+        ms = statistics.median(r[0] for r in runs)
+        print(f"{label:<22} | {ms:>10.1f} | {', '.join(runs[0][1]) or '-'}")
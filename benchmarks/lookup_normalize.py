@@ -0,0 +1,65 @@
+"""
+LookupTableMWL throughput, LETTERS as a translate table vs the previous per-character loop, per word and on long paragraphs
+
+Both normalize the text with the same str.replace chain, pauses and then DIMAP digraphs in
+order. tests/test_lookup_normalize.py checks the outputs are unchanged.
+
+    python -m benchmarks.lookup_normalize [--paragraph-words 2000]
+"""
+import argparse
+import random
+import time
+
+from mwl_phonemizer.char_lookup_mwl import LookupTableMWL
+
+
+def phonemize_by_loop(text: str) -> str:
+    """the previous per-character LETTERS lookup"""
+    phonemes = ""
+    for char in LookupTableMWL.normalize(text):
+        phonemes += LookupTableMWL.LETTERS[char][0] if char in LookupTableMWL.LETTERS else char
+    return phonemes
+
+
+def chars_per_sec(func, paragraph: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(paragraph)
+    return len(paragraph) * repeat / (time.perf_counter() - start)
+
+
+def words_per_sec(func, words: list[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for word in words:
+            func(word)
+    return len(words) * repeat / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--paragraph-words", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    pho = LookupTableMWL()
+    vocab = list(pho.GOLD)
+
+    def translate(text: str) -> str:
+        return pho.phonemize(text, lookup_word=False)
+
+    rnd = random.Random(1)
+    paragraph = " ".join(rnd.choice(vocab) + rnd.choice(["", "", "", ",", ".", "!"])
+                         for _ in range(args.paragraph_words))
+    old = chars_per_sec(phonemize_by_loop, paragraph, args.repeat)
+    new = chars_per_sec(translate, paragraph, args.repeat)
+    print(f"paragraph of {len(paragraph)} chars")
+    print(f"{'LETTERS loop':<20} | {old / 1e6:>7.2f} M chars/sec")
+    print(f"{'translate table':<20} | {new / 1e6:>7.2f} M chars/sec ({new / old:.2f}x)")
+
+    words = [w for w in pho.tokenize(paragraph) if w.isalpha()]
+    old = words_per_sec(phonemize_by_loop, words, args.repeat)
+    new = words_per_sec(translate, words, args.repeat)
+    print(f"\n{len(words)} words")
+    print(f"{'LETTERS loop':<20} | {old:>9.0f} words/sec")
+    print(f"{'translate table':<20} | {new:>9.0f} words/sec ({new / old:.2f}x)")
@@ -0,0 +1,44 @@
+"""
+NgramMWLPhonemizer.phonemize_many (numpy) vs phonemize per word, by batch size
+
+    python -m benchmarks.ngram_batch [--n 4] [--max-batch 16384]
+"""
+import argparse
+import random
+import time
+
+from mwl_phonemizer.ngram_mwl import NgramMWLPhonemizer
+
+
+def words_per_sec(func, batches: list[list[str]]) -> float:
+    start = time.perf_counter()
+    for batch in batches:
+        func(batch)
+    return sum(len(batch) for batch in batches) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--n", type=int, default=4)
+    parser.add_argument("--max-batch", type=int, default=16384)
+    parser.add_argument("--words", type=int, default=50000, help="words phonemized per batch size")
+    args = parser.parse_args()
+
+    pho = NgramMWLPhonemizer(n=args.n, cache_size=0)
+    vocab = list(pho.GOLD)
+    rnd = random.Random(0)
+
+    print(f"{'batch':>6} | {'scalar w/s':>11} | {'numpy w/s':>11} | speedup")
+    print("-" * 45)
+    crossover = None
+    size = 1
+    while size <= args.max_batch:
+        batches = [[rnd.choice(vocab) for _ in range(size)] for _ in range(max(1, args.words // size))]
+        scalar = words_per_sec(lambda batch: [pho.phonemize(w) for w in batch], batches)
+        vectorized = words_per_sec(pho.phonemize_many, batches)
+        if crossover is None and vectorized > scalar:
+            crossover = size
+        print(f"{size:>6} | {scalar:>11.0f} | {vectorized:>11.0f} | {vectorized / scalar:.2f}x")
+        size *= 2
+    print(f"\nphonemize_many is faster from batches of {crossover} words" if crossover
+          else "\nphonemize_many never won")
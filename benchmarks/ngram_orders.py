@@ -0,0 +1,58 @@
+"""
+words/sec and PER of NgramMWLPhonemizer as a function of n, for both smoothing modes
+
+PER is measured on the training data (as in the README table) and with k-fold cross validation,
+where back-off to shorter contexts actually matters.
+
+    python -m benchmarks.ngram_orders [--max-n 8] [--folds 5]
+"""
+import argparse
+import random
+import time
+
+from mwl_phonemizer.ngram_mwl import NgramMWLPhonemizer
+
+
+def per(pho: NgramMWLPhonemizer, pairs: list[tuple[str, str]]) -> float:
+    errors = sum(pho.word_edit_distance(pho.phonemize(word), gold) for word, gold in pairs)
+    return errors / sum(len(gold) for _, gold in pairs)
+
+
+def cross_validated_per(n: int, smoothing: str, pairs: list[tuple[str, str]], folds: int) -> float:
+    errors = 0
+    for fold in range(folds):
+        held_out = pairs[fold::folds]
+        pho = NgramMWLPhonemizer(n=n, smoothing=smoothing, cache_size=0)
+        pho.g2p_model.clear()
+        pho.train(dict(p for i, p in enumerate(pairs) if i % folds != fold))
+        pho.finalize()
+        errors += per(pho, held_out) * sum(len(gold) for _, gold in held_out)
+    return errors / sum(len(gold) for _, gold in pairs)
+
+
+def words_per_sec(pho: NgramMWLPhonemizer, words: list[str]) -> float:
+    start = time.perf_counter()
+    for word in words:
+        pho.phonemize(word)
+    return len(words) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--max-n", type=int, default=8)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=50, help="passes over the gold vocabulary for words/sec")
+    args = parser.parse_args()
+
+    pairs = list(NgramMWLPhonemizer(n=1).GOLD.items())
+    random.Random(0).shuffle(pairs)
+    words = [word for word, _ in pairs] * args.repeat
+
+    print(f"{len(pairs)} gold words, {args.folds}-fold cross validation\n")
+    print(f"{'n':>2} | {'smoothing':<12} | {'words/sec':>10} | {'PER train':>9} | {'PER held-out':>12}")
+    print("-" * 58)
+    for n in range(1, args.max_n + 1):
+        for smoothing in NgramMWLPhonemizer.SMOOTHING:
+            pho = NgramMWLPhonemizer(n=n, smoothing=smoothing, cache_size=0)
+            print(f"{n:>2} | {smoothing:<12} | {words_per_sec(pho, words):>10.0f} | "
+                  f"{per(pho, pairs):>9.2%} | {cross_validated_per(n, smoothing, pairs, args.folds):>12.2%}")
@@ -0,0 +1,62 @@
+"""
+per word cost of OrthographyRulesMWL grapheme segmentation, the grapheme trie vs probing every grapheme length
+
+    python -m benchmarks.orthography_segmentation [--repeat 20]
+"""
+import argparse
+import time
+
+from mwl_phonemizer.orthography_hand_rules import OrthographyRulesMWL
+
+
+def segment_by_lengths(pho: OrthographyRulesMWL, word: str) -> list[str]:
+    """the previous segmentation, sorts the grapheme lengths and slices the word at every position"""
+    graphemes = []
+    i = 0
+    while i < len(word):
+        for length in sorted([len(g) for g in pho.MWL_ALPHABET_MAP.keys()], reverse=True):
+            if i + length <= len(word) and word[i:i + length] in pho.MWL_ALPHABET_MAP:
+                graphemes.append(word[i:i + length])
+                i += length
+                break
+        else:
+            graphemes.append(word[i])
+            i += 1
+    return graphemes
+
+
+def segment_by_trie(pho: OrthographyRulesMWL, word: str) -> list[str]:
+    graphemes = []
+    i = 0
+    while i < len(word):
+        grapheme = pho._longest_grapheme(word, i) or word[i]
+        graphemes.append(grapheme)
+        i += len(grapheme)
+    return graphemes
+
+
+def us_per_word(func, words: list[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for word in words:
+            func(word)
+    return (time.perf_counter() - start) / (repeat * len(words)) * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=20, help="passes over the gold vocabulary")
+    args = parser.parse_args()
+
+    pho = OrthographyRulesMWL()
+    words = list(pho.GOLD)
+    mismatches = [w for w in words if segment_by_lengths(pho, w) != segment_by_trie(pho, w)]
+    assert not mismatches, f"segmentations differ for {mismatches}"
+
+    old = us_per_word(lambda w: segment_by_lengths(pho, w), words, args.repeat)
+    new = us_per_word(lambda w: segment_by_trie(pho, w), words, args.repeat)
+    full = us_per_word(pho.phonemize_word, words, args.repeat)
+    print(f"{len(words)} gold words, {len(pho.MWL_ALPHABET_MAP)} graphemes\n")
+    print(f"{'segmentation by lengths':<26} | {old:>8.2f} us/word")
+    print(f"{'segmentation by trie':<26} | {new:>8.2f} us/word ({old / new:.1f}x)")
+    print(f"{'phonemize_word':<26} | {full:>8.2f} us/word")
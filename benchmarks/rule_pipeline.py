@@ -0,0 +1,117 @@
+"""
+IPA correction cost per word, compiled RulePipeline vs the previous chain of re.sub and str.replace calls
+
+Checks first that both give the same output, on epitran IPA of the gold words (when epitran is
+installed), on the gold IPA itself and on random strings of the characters the rules look at.
+
+    python -m benchmarks.rule_pipeline [--repeat 20] [--stats]
+"""
+import argparse
+import random
+import re
+import time
+
+from mwl_phonemizer.char_lookup_mwl import LookupTableMWL
+from mwl_phonemizer.rule_pipeline import PT_IPA_CORRECTIONS, PT_IPA_EXCEPTIONS, PT_IPA_RULES, RulePipeline
+
+
+def apply_by_chain(ipa: str, ortho: str) -> str:
+    """the previous EspeakMWL._apply_with_ortho / EpitranMWL.apply_with_ortho"""
+    out = ipa
+    if ortho == "l":
+        return "l̩"
+    elif ortho == "ls":
+        return "l̩s̺"
+    out = out.replace("ɹ", "ɾ").replace("ʁ", "r")
+    out = re.sub(r'([aeiouɐɛɔuiɨ])b([aeiouɐɛɔuiɨ])', r'β', out)
+    out = re.sub(r'([aeiouɐɛɔuiɨ])d([aeiouɐɛɔuiɨ])', r'ð', out)
+    out = re.sub(r'([aeiouɐɛɔuiɨ])g([aeiouɐɛɔuiɨ])', r'ɣ', out)
+    out = re.sub(r"lh", "ʎ", out)
+    out = re.sub(r"nh", "ɲ", out)
+    out = out.replace("aɪ", "aj")
+    out = out.replace("eɪ", "ej")
+    out = out.replace("oʊ", "ow")
+    out = out.replace("au", "aw")
+    out = out.replace("iŋ", "ĩ")
+    out = out.replace("uŋ", "ũ")
+    out = out.replace("ãŋ", "ɐ̃")
+    out = out.replace("eɪŋ", "ej̃")
+    out = out.replace("aɪŋ", "aj̃")
+    out = out.replace("oʊŋ", "ow̃")
+    if out.endswith("ʃ"):
+        out = out[:-1] + "s̺"
+    out = re.sub(r'^s(?=[^aeiouɐɛɔuiɨ])', 's̺', out)
+    out = re.sub(r's(?=[eiɨ])', 's̻', out)
+    out = re.sub(r'^(pl|kl|fl)', 'tʃ', out)
+    out = re.sub(r'^l(?=[aeiouɐɛɔuiɨ])', 'ʎ', out)
+    out = re.sub(r'o$', 'u', out)
+    if "ç" in ortho.lower() or re.search(r"c[ei]", ortho.lower()):
+        out = out.replace("s̺", "s̻").replace("z̺", "z̻")
+    out = re.sub(r'ˈ([^aeiouɐɛɔuiɨ]*)([aeiouɐɛɔuiɨ])', r'ˈ\2', out)
+    out = out.replace("ɨɾə", "ɨɾ")
+    out = out.replace("bˈiɾ", "ˈβiɾ")
+    out = out.replace("ʃk", "s̺k")
+    if ortho.startswith("be") and out.startswith("bˌe"):
+        out = "bɨ" + out[3:]
+    if ortho.startswith("amb") and out.startswith("ɐ̃mb"):
+        out = "ɐ̃b" + out[3:]
+    if ortho.endswith("uç") and out.endswith("us"):
+        out = out[:-1] + "s̻"
+    if out.endswith("oŋ"):
+        out = out[:-2] + "õ"
+    if out.endswith("ɾədʊ"):
+        out = out[-4:] + "ɾdu"
+    return out
+
+
+def epitran_pairs(words: list[str]) -> list[tuple[str, str]]:
+    try:
+        import epitran
+    except ImportError:
+        return []
+    pho = epitran.Epitran("por-Latn")
+    return [(pho.transliterate(word), word) for word in words]
+
+
+def regression_check(pairs: list[tuple[str, str]], samples: int = 200000) -> int:
+    rnd = random.Random(0)
+    chars = ["ɹ", "ʁ", "a", "e", "i", "o", "u", "ɐ", "ɨ", "b", "d", "g", "l", "h", "n", "ɪ", "ʊ", "ŋ", "ã",
+             "ʃ", "s", "k", "p", "f", "s̺", "z̺", "ˈ", "ˌ", "ɾ", "ə", "m", "ɐ̃", "\n"]
+    orthos = ["ls", "l", "bela", "ambos", "luç", "cena", "Cinco", "paç", "casa"]
+    pairs = pairs + [("".join(rnd.choice(chars) for _ in range(rnd.randint(1, 10))), rnd.choice(orthos))
+                     for _ in range(samples)]
+    mismatches = [p for p in pairs if PT_IPA_CORRECTIONS.apply(*p) != apply_by_chain(*p)]
+    assert not mismatches, f"corrections changed for {mismatches[:10]}"
+    return len(pairs)
+
+
+def us_per_word(func, pairs: list[tuple[str, str]], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for ipa, ortho in pairs:
+            func(ipa, ortho)
+    return (time.perf_counter() - start) / (repeat * len(pairs)) * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=20, help="passes over the gold vocabulary")
+    parser.add_argument("--stats", action="store_true", help="print per rule hits and timings")
+    args = parser.parse_args()
+
+    gold = LookupTableMWL().GOLD
+    pairs = epitran_pairs(list(gold)) or [(ipa, word) for word, ipa in gold.items()]
+    print(f"regression check: {regression_check(pairs + [(ipa, word) for word, ipa in gold.items()])} "
+          f"words identical\n")
+
+    old = us_per_word(apply_by_chain, pairs, args.repeat)
+    new = us_per_word(PT_IPA_CORRECTIONS.apply, pairs, args.repeat)
+    print(f"{len(pairs)} words, {len(PT_IPA_RULES)} rules in {len(PT_IPA_CORRECTIONS._steps)} steps\n")
+    print(f"{'re.sub / str.replace chain':<27} | {old:>6.2f} us/word")
+    print(f"{'RulePipeline':<27} | {new:>6.2f} us/word ({old / new:.1f}x)")
+
+    if args.stats:
+        pipeline = RulePipeline(PT_IPA_RULES, PT_IPA_EXCEPTIONS, stats=True)
+        for ipa, ortho in pairs:
+            pipeline.apply(ipa, ortho)
+        print("\n" + pipeline.report())
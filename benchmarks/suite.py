@@ -0,0 +1,182 @@
+"""
+cold start, per word latency, sentence throughput and peak RSS of every engine, on the sample texts and a synthetic corpus
+
+Every engine is measured in its own fresh interpreter, so cold start includes the imports
+and model loading, and peak RSS is the engine's alone. CRF models are built into the model
+registry by an untimed first run. Engines whose external tool (espeak-ng, epitran) is not
+installed are reported as skipped.
+
+    python -m benchmarks.suite [--engines ...] [--sentences 5000] [--json suite.json] [--markdown suite.md]
+"""
+import argparse
+import json
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+
+ENGINES = ["CRFPhonemizer", "CRFOrthoCorrector", "CRFEspeakCorrector", "CRFEpitranCorrector",
+           "EspeakMWL", "EpitranMWL", "OrthographyRulesMWL", "NgramMWLPhonemizer", "LookupTableMWL"]
+
+SAMPLE_TEXTS = [
+    "Muitas lhénguas ténen proua de ls sous pergaminos antigos, de la lhiteratura screbida hai cientos d'anhos i de scritores hai muito afamados, hoije bandeiras dessas lhénguas. Mas outras hai que nun puoden tener proua de nada desso, cumo ye l causo de la lhéngua mirandesa.",
+    "Todos ls seres houmanos nácen lhibres i eiguales an honra i an dreitos. Dotados de rezon i de cuncéncia, dében de se dar bien uns culs outros i cumo armano",
+    "Hai más fuogo alhá, i ye deimingo!",
+    "Quien dirie qu'antre ls matos eiriçados",
+    "Las ourriêtas i ls rius d'esta tiêrra,",
+    "Bibie, cumo l chaugarço de la siêrra,",
+    "Ua lhéngua de sons tan bariados?",
+    "Mostre-se i fale-s' essa lhéngua filha",
+    "D'un pobo que ten neilha l choro i l canto!",
+    "Nada por ciêrto mos cautiba tanto",
+    "Cumo la form' an que l'eideia brilha.",
+    "Zgraçiado d'aquel, qu'abandonando",
+    "La patri' an que naciu, la casa i l huôrto.",
+    "Tamien se squeçe de la fala! Quando",
+    "L furdes ber, talbéç que stéia muôrto!",
+]
+
+# measured in the child, (label, unit) in table order
+COLUMNS = [("cold start", "s"), ("p50", "us"), ("p95", "us"), ("p99", "us"),
+           ("sample sentences/s", ""), ("corpus sentences/s", ""), ("peak RSS", "MB")]
+
+
+def synthetic_corpus(sentences: int, seed: int = 0) -> list[str]:
+    """Sentences of 4 to 20 words, zipf distributed over the sample and gold words plus 20% unseen words"""
+    from mwl_phonemizer.base import MirandesePhonemizer
+    from mwl_phonemizer.epitran_transducer import generated_words
+
+    rnd = random.Random(seed)
+    sample_words = [w for text in SAMPLE_TEXTS for w in MirandesePhonemizer.tokenize(text) if w.isalpha()]
+    vocab = list(dict.fromkeys([*sample_words, *MirandesePhonemizer().GOLD]))
+    weights = [1 / rank for rank in range(1, len(vocab) + 1)]
+    unseen = [w for w in generated_words(sentences * 4, seed) if w.isalpha()]
+    corpus = []
+    for _ in range(sentences):
+        words = [rnd.choice(unseen) if rnd.random() < 0.2 else rnd.choices(vocab, weights)[0]
+                 for _ in range(rnd.randint(4, 20))]
+        corpus.append(" ".join(words).capitalize() + rnd.choice(".!?,"))
+    return corpus
+
+
+def percentile(values: list[float], q: float) -> float:
+    """nearest rank percentile of sorted values"""
+    return values[min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))]
+
+
+def measure(engine: str, sentences: int, latency_words: int, seed: int) -> dict:
+    """Runs in the child interpreter, the clock starts before the package is imported."""
+    start = time.perf_counter()
+    import mwl_phonemizer
+    try:
+        pho = getattr(mwl_phonemizer, engine)()
+        # lazy engines load their backend (espeak, epitran, numpy tables) on the first batch
+        pho.phonemize_batch(SAMPLE_TEXTS, lookup_word=False)
+    except (ImportError, RuntimeError) as e:  # EspeakError is a RuntimeError
+        return {"engine": engine, "skipped": f"{type(e).__name__}: {e}"}
+    cold_start = time.perf_counter() - start
+
+    corpus = synthetic_corpus(sentences, seed)
+    words = list(dict.fromkeys(w for text in SAMPLE_TEXTS + corpus for w in pho.tokenize(text) if w.isalpha()))
+    latencies = []
+    for word in words[:latency_words]:
+        t = time.perf_counter()
+        pho.phonemize_words([word], lookup_word=False)
+        latencies.append(time.perf_counter() - t)
+    latencies.sort()
+
+    t = time.perf_counter()
+    pho.phonemize_batch(SAMPLE_TEXTS)
+    sample_seconds = time.perf_counter() - t
+    if pho.word_cache is not None:  # the corpus starts cold too
+        pho.word_cache.clear()
+    t = time.perf_counter()
+    pho.phonemize_batch(corpus)
+    corpus_seconds = time.perf_counter() - t
+
+    # kilobytes on linux, bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return {
+        "engine": engine,
+        "cold start": cold_start,
+        "p50": percentile(latencies, 50) * 1e6,
+        "p95": percentile(latencies, 95) * 1e6,
+        "p99": percentile(latencies, 99) * 1e6,
+        "sample sentences/s": len(SAMPLE_TEXTS) / sample_seconds,
+        "corpus sentences/s": len(corpus) / corpus_seconds,
+        "peak RSS": max_rss / 2 ** 20,
+        "latency words": len(latencies),
+        "corpus words": sum(len(text.split()) for text in corpus),
+    }
+
+
+def run_child(engine: str, args, prepare: bool = False) -> dict:
+    cmd = [sys.executable, "-m", "benchmarks.suite", "--child", engine, "--sentences", str(args.sentences),
+           "--latency-words", str(args.latency_words), "--seed", str(args.seed)]
+    if prepare:  # only builds the CRF models into the registry
+        cmd = [sys.executable, "-c", f"import mwl_phonemizer; mwl_phonemizer.{engine}()"]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=args.timeout)
+    except subprocess.TimeoutExpired:
+        return {"engine": engine, "skipped": f"timed out after {args.timeout}s"}
+    if proc.returncode != 0:
+        if prepare:  # the measured run reports why
+            return {}
+        return {"engine": engine, "skipped": (proc.stderr.strip().splitlines() or ["failed"])[-1]}
+    return json.loads(proc.stdout) if not prepare else {}
+
+
+def markdown_table(results: list[dict]) -> str:
+    header = ["Engine"] + [f"{label} ({unit})" if unit else label for label, unit in COLUMNS]
+    lines = ["| " + " | ".join(header) + " |", "|" + "|".join("---" for _ in header) + "|"]
+    for result in results:
+        if "skipped" in result:
+            cells = [f"skipped: {result['skipped']}"] + [""] * (len(COLUMNS) - 1)
+        else:
+            cells = [f"{result[label]:.3f}" if label == "cold start" else f"{result[label]:.1f}" if unit
+                     else f"{result[label]:.0f}" for label, unit in COLUMNS]
+        lines.append("| " + " | ".join([result["engine"]] + cells) + " |")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--engines", nargs="+", default=ENGINES, choices=ENGINES)
+    parser.add_argument("--sentences", type=int, default=5000, help="synthetic corpus size")
+    parser.add_argument("--latency-words", type=int, default=2000,
+                        help="distinct words timed one by one for the latency percentiles")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=1800, help="seconds per engine")
+    parser.add_argument("--json", help="write the results as JSON to this file")
+    parser.add_argument("--markdown", help="write the markdown table to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.sentences, args.latency_words, args.seed)))
+        sys.exit()
+
+    results = []
+    for engine in args.engines:
+        run_child(engine, args, prepare=True)
+        results.append(run_child(engine, args))
+        print(f"{engine}: {results[-1].get('skipped', 'done')}", file=sys.stderr)
+
+    table = markdown_table(results)
+    print(table)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sentences": args.sentences,
+        "latency words": args.latency_words,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.markdown:
+        with open(args.markdown, "w", encoding="utf-8") as f:
+            f.write(table + "\n")
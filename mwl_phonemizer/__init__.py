@@ -1,13 +1,47 @@
-from mwl_phonemizer.crf_mwl import  CRFPhonemizer
-from mwl_phonemizer.epitran_mwl import EpitranMWL
-from mwl_phonemizer.espeak_mwl import EspeakMWL
-from mwl_phonemizer.ngram_mwl import NgramMWLPhonemizer
-from mwl_phonemizer.orthography_hand_rules import OrthographyRulesMWL
-from mwl_phonemizer.crf_espeak_mwl import CRFEspeakCorrector
-from mwl_phonemizer.crf_epitran_mwl import CRFEpitranCorrector
-from mwl_phonemizer.crf_ortho_mwl import CRFOrthoCorrector
-from mwl_phonemizer.char_lookup_mwl import LookupTableMWL
+from typing import TYPE_CHECKING
 
+# engines are imported on first access, so services that only need the
+# rule based phonemizers never pay for sklearn_crfsuite / joblib / Levenshtein
+_LAZY_ENGINES = {
+    "CRFPhonemizer": "mwl_phonemizer.crf_mwl",
+    "EpitranMWL": "mwl_phonemizer.epitran_mwl",
+    "EspeakMWL": "mwl_phonemizer.espeak_mwl",
+    "NgramMWLPhonemizer": "mwl_phonemizer.ngram_mwl",
+    "OrthographyRulesMWL": "mwl_phonemizer.orthography_hand_rules",
+    "CRFEspeakCorrector": "mwl_phonemizer.crf_espeak_mwl",
+    "CRFEpitranCorrector": "mwl_phonemizer.crf_epitran_mwl",
+    "CRFOrthoCorrector": "mwl_phonemizer.crf_ortho_mwl",
+    "LookupTableMWL": "mwl_phonemizer.char_lookup_mwl",
+    "CascadeMWL": "mwl_phonemizer.cascade",
+}
+
+__all__ = list(_LAZY_ENGINES)
+
+if TYPE_CHECKING:
+    from mwl_phonemizer.crf_mwl import CRFPhonemizer
+    from mwl_phonemizer.epitran_mwl import EpitranMWL
+    from mwl_phonemizer.espeak_mwl import EspeakMWL
+    from mwl_phonemizer.ngram_mwl import NgramMWLPhonemizer
+    from mwl_phonemizer.orthography_hand_rules import OrthographyRulesMWL
+    from mwl_phonemizer.crf_espeak_mwl import CRFEspeakCorrector
+    from mwl_phonemizer.crf_epitran_mwl import CRFEpitranCorrector
+    from mwl_phonemizer.crf_ortho_mwl import CRFOrthoCorrector
+    from mwl_phonemizer.char_lookup_mwl import LookupTableMWL
+    from mwl_phonemizer.cascade import CascadeMWL
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ENGINES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value  # cache, next lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ENGINES))
 
 
 if __name__ == "__main__":
@@ -31,6 +65,8 @@ if __name__ == "__main__":
     L furdes ber, talbéç que stéia muôrto!"""
     ]
 
+    from mwl_phonemizer.crf_espeak_mwl import CRFEspeakCorrector
+
     phonemizer = CRFEspeakCorrector()
     for text in sample_texts:
         print(f"Original: {text}")
@@ -1,11 +1,14 @@
 import abc
+import hashlib
 import json
 import re
 import os
 from collections import Counter
-import editdistance
 from enum import Enum
 
+from mwl_phonemizer.cache import WordCache, DiskWordCache
+from mwl_phonemizer.version import VERSION_STR
+
 class Dialects(str, Enum):
     CENTRAL = "central"
     RAIANO = "raiano"
@@ -13,13 +16,26 @@ class Dialects(str, Enum):
 
 
 class MirandesePhonemizer:
+    # engines whose backend reads capital letters differently, see normalize_word
+    CASE_SENSITIVE = False
+
     def __init__(self,
                  gold_dict: str | None = None,
                  raiano_dict: str | None = None,   # dialect exceptions
                  sendinese_dict: str | None = None, # dialect exceptions
-                 dialect: Dialects = Dialects.CENTRAL):
+                 dialect: Dialects = Dialects.CENTRAL,
+                 cache_size: int = 10000,  # 0 disables the word cache
+                 word_cache: WordCache | None = None,  # share one cache between phonemizers
+                 disk_cache: DiskWordCache | str | None = None):  # persistent cache, or path to one
 
         self.dialect = dialect
+        if word_cache is None and cache_size > 0:
+            word_cache = WordCache(cache_size)
+        self.word_cache = word_cache
+        if isinstance(disk_cache, str):
+            disk_cache = DiskWordCache(disk_cache)
+        self.disk_cache = disk_cache
+        self._fingerprints = {}
 
         gold_dict = gold_dict or f"{os.path.dirname(__file__)}/central.json"
         raiano_dict = raiano_dict or f"{os.path.dirname(__file__)}/raiano.json"
@@ -33,21 +49,138 @@ class MirandesePhonemizer:
             self.SENDINESE_GOLD = {k: self.strip_markers(v) for k, v in json.load(f).items()}
 
     def phonemize(self, word: str, lookup_word: bool = True) -> str:
+        """Phonemizes one word, served from the word / disk cache like the batch APIs."""
+        if lookup_word and (self.word_cache is not None or self.disk_cache is not None):
+            return self._phonemize_unique_cached([word], lookup_word=lookup_word)[word]
+        return self._phonemize_word(word, lookup_word=lookup_word)
+
+    def _phonemize_word(self, word: str, lookup_word: bool = True) -> str:
+        """The engine itself, without cache, subclasses implement this."""
         if lookup_word and word.lower() in self.GOLD:
             return self.GOLD[word.lower()]
         raise ValueError(f"unknown word: '{word}'")
 
     def phonemize_sentence(self,
                            text: str, lookup_word: bool = True):
+        return self.phonemize_batch([text], lookup_word=lookup_word)[0]
+
+    @staticmethod
+    def tokenize(text: str) -> list[str]:
+        """Splits text into words and the punctuation/spaces between them."""
         text = text.replace("-", " ")
-        words = re.findall(r"\b\w+\b|[\W_]+", text)  # Split by words and keep punctuation/spaces
-        phonemized_parts = []
-        for word_or_punc in words:
-            if word_or_punc.isalpha():
-                phonemized_parts.append(self.phonemize(word_or_punc, lookup_word=lookup_word))
-            else:
-                phonemized_parts.append(word_or_punc)  # Keep punctuation and spaces as is
-        return "".join(phonemized_parts)
+        return re.findall(r"\b\w+\b|[\W_]+", text)  # Split by words and keep punctuation/spaces
+
+    def phonemize_batch(self, texts: list[str], lookup_word: bool = True) -> list[str]:
+        """
+        Phonemizes many texts at once.
+
+        Every text is tokenized once and each distinct word in the whole batch
+        is phonemized exactly once, then the outputs are reassembled in order.
+        """
+        tokenized = [self.tokenize(text) for text in texts]
+        words = dict.fromkeys(tok for tokens in tokenized for tok in tokens if tok.isalpha())
+        phonemes = self._phonemize_unique_cached(list(words), lookup_word=lookup_word)
+        return ["".join(phonemes[tok] if tok.isalpha() else tok  # Keep punctuation and spaces as is
+                        for tok in tokens)
+                for tokens in tokenized]
+
+    def phonemize_words(self, words: list[str], lookup_word: bool = True) -> list[str]:
+        """Phonemizes a list of words, calling the engine once per distinct word."""
+        phonemes = self._phonemize_unique_cached(list(dict.fromkeys(words)), lookup_word=lookup_word)
+        return [phonemes[word] for word in words]
+
+    def phonemize_with_confidence(self, words: list[str], lookup_word: bool = True) -> list[tuple[str, float]]:
+        """
+        (phonemes, confidence between 0 and 1) of every word, see cascade.CascadeMWL.
+
+        Engines without a measure of their own uncertainty are only sure of the words they look up in GOLD,
+        in a cascade they pass every other word through.
+        """
+        phonemes = self.phonemize_words(words, lookup_word=lookup_word)
+        return [(pho, 1.0 if lookup_word and word.lower() in self.GOLD else 0.0)
+                for word, pho in zip(words, phonemes)]
+
+    def engine_config(self) -> dict:
+        """Everything that changes this phonemizer's output, subclasses add their own parameters."""
+        return {"engine": type(self).__name__, "dialect": self.dialect}
+
+    def _model_files(self) -> list[str]:
+        """Files the engine loads its model from, they are hashed into the fingerprint."""
+        return []
+
+    def _model_data(self) -> list[bytes]:
+        """Models hashed into the fingerprint, the contents of the model files unless the engine holds them in memory"""
+        data = []
+        for path in self._model_files():
+            with open(path, "rb") as f:
+                data.append(f.read())
+        return data
+
+    def fingerprint(self) -> str:
+        """
+        Hash of everything that determines this phonemizer's output: package version,
+        engine class and parameters, gold dictionaries and model files.
+        """
+        namespace = tuple(sorted(self.engine_config().items()))
+        if namespace not in self._fingerprints:
+            sha = hashlib.sha256()
+            sha.update(json.dumps({
+                "version": VERSION_STR,
+                "config": dict(namespace),
+                "gold": self.GOLD,
+                "raiano": self.RAIANO_GOLD,
+                "sendinese": self.SENDINESE_GOLD
+            }, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+            for data in self._model_data():
+                sha.update(hashlib.sha256(data).digest())
+            self._fingerprints[namespace] = sha.hexdigest()
+        return self._fingerprints[namespace]
+
+    def _model_changed(self):
+        """Called by engines after loading or training a model, the next fingerprint hashes the new model files"""
+        self._fingerprints.clear()
+
+    def normalize_word(self, word: str) -> str:
+        """
+        The form words are cached under, all words with the same normalized form phonemize
+        identically. Lowercased, unless the engine is CASE_SENSITIVE.
+        """
+        return word if self.CASE_SENSITIVE else word.lower()
+
+    def _phonemize_unique_cached(self, words: list[str], lookup_word: bool = True) -> dict[str, str]:
+        # evaluation runs (lookup_word=False) always hit the engine
+        if not lookup_word:
+            return self._phonemize_unique_words(words, lookup_word=lookup_word)
+        keys = {word: self.normalize_word(word) for word in words}
+        unique = list(dict.fromkeys(keys.values()))
+        phonemes = {}
+        # the fingerprint covers the gold dictionaries and model files, so phonemizers sharing a cache never collide
+        namespace = self.fingerprint()
+        if self.word_cache is not None:
+            phonemes = self.word_cache.get_many(namespace, unique)
+        missing = [word for word in unique if word not in phonemes]
+        if missing and self.disk_cache is not None:
+            stored = self.disk_cache.get_many(namespace, missing)
+            if stored and self.word_cache is not None:
+                self.word_cache.put_many(namespace, stored)
+            phonemes.update(stored)
+            missing = [word for word in missing if word not in stored]
+        if missing:
+            new = self._phonemize_unique_words(missing, lookup_word=lookup_word)
+            if self.word_cache is not None:
+                self.word_cache.put_many(namespace, new)
+            if self.disk_cache is not None:
+                self.disk_cache.put_many(namespace, new)
+            phonemes.update(new)
+        return {word: phonemes[key] for word, key in keys.items()}
+
+    def _phonemize_unique_words(self, words: list[str], lookup_word: bool = True) -> dict[str, str]:
+        """
+        Phonemizes a list of distinct words, returning a {word: phonemes} dict.
+
+        Subclasses with a natively batched backend should override this.
+        """
+        return {word: self._phonemize_word(word, lookup_word=lookup_word) for word in words}
 
     @staticmethod
     def strip_markers(ipa: str) -> str:
@@ -60,6 +193,7 @@ class MirandesePhonemizer:
 
     @staticmethod
     def word_edit_distance(a: str, b: str) -> int:
+        import editdistance
         return editdistance.eval(a, b)
 
     def evaluate_on_gold(self, limit=None, detailed=False, show_changes=False):
@@ -0,0 +1,194 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+
+class WordCache:
+    """
+    Thread-safe, bounded LRU cache of word -> phonemes.
+
+    A single cache can be shared by several phonemizers, entries are namespaced
+    by each phonemizer's fingerprint (engine configuration, gold dictionaries and
+    model) so they never collide.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        if max_size <= 0:
+            raise ValueError("max_size must be a positive integer")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[tuple[Hashable, str], str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, namespace: Hashable, words: list[str]) -> dict[str, str]:
+        """Returns the cached {word: phonemes} for every word that is in the cache."""
+        found = {}
+        with self._lock:
+            for word in words:
+                key = (namespace, word)
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    found[word] = self._data[key]
+            self.hits += len(found)
+            self.misses += len(words) - len(found)
+        return found
+
+    def put_many(self, namespace: Hashable, phonemes: dict[str, str]):
+        with self._lock:
+            for word, pho in phonemes.items():
+                key = (namespace, word)
+                self._data[key] = pho
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, namespace: Hashable, word: str) -> str | None:
+        return self.get_many(namespace, [word]).get(word)
+
+    def put(self, namespace: Hashable, word: str, phonemes: str):
+        self.put_many(namespace, {word: phonemes})
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskWordCache:
+    """
+    Persistent word -> phonemes cache stored in SQLite.
+
+    Entries are keyed by a phonemizer fingerprint (engine class, parameters,
+    gold dictionaries, model files and package version), so a stale
+    pronunciation is never served after any of those change.
+
+    The database runs in WAL mode and every process (and thread) opens its own
+    connection, so several worker processes can read and write it concurrently.
+    When ``max_entries`` is exceeded the least recently used entries are dropped.
+    The size is only checked every ``prune_every`` inserted words per connection
+    (default 1% of ``max_entries``) and at the end of warmup(), so the table can
+    briefly hold up to ``prune_every`` extra rows per writing process.
+    """
+    CHUNK_SIZE = 500  # words per query, sqlite limits the number of bound parameters
+
+    def __init__(self, path: str, max_entries: int | None = 1_000_000, timeout: float = 30.0,
+                 prune_every: int | None = None):
+        self.path = os.path.expanduser(path)
+        self.max_entries = max_entries
+        self.prune_every = prune_every or max(1, (max_entries or 0) // 100)
+        self.timeout = timeout
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS pronunciations ("
+                         "fingerprint TEXT NOT NULL, "
+                         "word TEXT NOT NULL, "
+                         "phonemes TEXT NOT NULL, "
+                         "atime REAL NOT NULL, "
+                         "UNIQUE (fingerprint, word))")
+            conn.execute("CREATE INDEX IF NOT EXISTS pronunciations_atime ON pronunciations (atime)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite connections must not cross a fork or be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._local.unpruned = 0  # words inserted by this connection since the last prune
+        return conn
+
+    def get_many(self, fingerprint: str, words: list[str]) -> dict[str, str]:
+        """Returns the stored {word: phonemes} for every word that is in the cache."""
+        found = {}
+        conn = self._connection()
+        for i in range(0, len(words), self.CHUNK_SIZE):
+            chunk = words[i:i + self.CHUNK_SIZE]
+            rows = conn.execute("SELECT word, phonemes FROM pronunciations "
+                                f"WHERE fingerprint = ? AND word IN ({','.join('?' * len(chunk))})",
+                                [fingerprint, *chunk])
+            found.update(rows)
+        if found and self.max_entries:
+            with conn:
+                conn.executemany("UPDATE pronunciations SET atime = ? WHERE fingerprint = ? AND word = ?",
+                                 [(time.time(), fingerprint, word) for word in found])
+        return found
+
+    def put_many(self, fingerprint: str, phonemes: dict[str, str]):
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO pronunciations (fingerprint, word, phonemes, atime) "
+                             "VALUES (?, ?, ?, ?)",
+                             [(fingerprint, word, pho, now) for word, pho in phonemes.items()])
+        self._local.unpruned += len(phonemes)
+        if self._local.unpruned >= self.prune_every:
+            self.prune()
+
+    def prune(self):
+        """Drops the least recently used entries above max_entries."""
+        conn = self._connection()
+        self._local.unpruned = 0
+        if not self.max_entries:
+            return
+        with conn:
+            excess = conn.execute("SELECT COUNT(*) FROM pronunciations").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute("DELETE FROM pronunciations WHERE rowid IN "
+                             "(SELECT rowid FROM pronunciations ORDER BY atime LIMIT ?)", (excess,))
+
+    def warmup(self, phonemizer, words: list[str], batch_size: int = 5000) -> int:
+        """Phonemizes and stores, in bulk, every word not cached yet. Returns how many were added."""
+        fingerprint = phonemizer.fingerprint()
+        added = 0
+        words = list(dict.fromkeys(phonemizer.normalize_word(word) for word in words))
+        for i in range(0, len(words), batch_size):
+            chunk = words[i:i + batch_size]
+            cached = self.get_many(fingerprint, chunk)
+            missing = [word for word in chunk if word not in cached]
+            if missing:
+                self.put_many(fingerprint, phonemizer._phonemize_unique_words(missing))
+                added += len(missing)
+        if added:
+            self.prune()
+        return added
+
+    def clear(self, fingerprint: str | None = None):
+        conn = self._connection()
+        with conn:
+            if fingerprint is None:
+                conn.execute("DELETE FROM pronunciations")
+            else:
+                conn.execute("DELETE FROM pronunciations WHERE fingerprint = ?", (fingerprint,))
+
+    def stats(self) -> dict:
+        conn = self._connection()
+        size, engines = conn.execute("SELECT COUNT(*), COUNT(DISTINCT fingerprint) FROM pronunciations").fetchone()
+        return {"path": self.path, "size": size, "max_entries": self.max_entries, "fingerprints": engines}
+
+    def __len__(self) -> int:
+        return self.stats()["size"]
@@ -0,0 +1,122 @@
+"""phonemizers chained by confidence, expensive engines only see the words the cheap ones are unsure of"""
+import importlib
+import threading
+
+from mwl_phonemizer.base import MirandesePhonemizer
+
+
+class CascadeMWL(MirandesePhonemizer):
+    """
+    Runs every word through a chain of engines, cheapest first.
+
+    Stages are (engine, threshold) pairs, the engine being an instance or the name of an engine
+    in mwl_phonemizer, built on first use, so e.g. espeak is only started once a word reaches it.
+    A stage keeps the words it phonemizes with a confidence of at least its threshold (see
+    phonemize_with_confidence, the CRF engines score words by their tag marginals) and hands the
+    others to the next stage. The last stage keeps every word it gets, its threshold is ignored.
+    Words in GOLD are looked up first and never reach a stage.
+
+    Engines without a confidence measure of their own are only sure of GOLD words, they would
+    pass every other word through, so they can only be the last stage.
+
+        CascadeMWL([("CRFOrthoCorrector", 0.3), ("CRFEspeakCorrector", None)])
+
+    There is no default chain, whether a cascade saves work depends on the relative cost and
+    accuracy of its engines, see benchmarks/cascade.py for the PER / throughput trade-off of
+    different thresholds and stage_stats() for the words handled by every stage.
+    """
+
+    def __init__(self, stages: list[tuple[str | MirandesePhonemizer, float | None]], *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        stages = list(stages)
+        if not stages:
+            raise ValueError("a cascade needs at least one stage")
+        if any(threshold is None for _, threshold in stages[:-1]):
+            raise ValueError("every stage but the last needs a confidence threshold")
+        self.engines: list[str | MirandesePhonemizer] = [engine for engine, _ in stages]
+        self.thresholds: list[float | None] = [threshold for _, threshold in stages]
+        classes = [getattr(importlib.import_module("mwl_phonemizer"), engine) if isinstance(engine, str)
+                   else type(engine) for engine in self.engines]
+        for cls in classes[:-1]:
+            if cls.phonemize_with_confidence is MirandesePhonemizer.phonemize_with_confidence:
+                raise ValueError(f"{cls.__name__} has no confidence measure, it can only be the last stage")
+        # words keep their case if any stage reads capital letters differently
+        self.CASE_SENSITIVE = any(cls.CASE_SENSITIVE for cls in classes)
+        self._built: dict[int, MirandesePhonemizer] = {}
+        self._counts = [0] * (len(stages) + 1)  # words looked up in GOLD, then per stage
+        self._lock = threading.Lock()
+
+    def engine_config(self) -> dict:
+        # stages given by name are built with their defaults, instances are identified by their
+        # fingerprint (gold dictionaries and models included), no stage is built here
+        stages = []
+        for engine, threshold in zip(self.engines, self.thresholds):
+            if isinstance(engine, str):
+                stages.append((engine, threshold))
+            else:
+                stages.append((type(engine).__name__, engine.fingerprint(), threshold))
+        return {**super().engine_config(), "stages": tuple(stages)}
+
+    def stage(self, i: int) -> MirandesePhonemizer:
+        """The engine of stage i, built on first use"""
+        engine = self.engines[i]
+        if not isinstance(engine, str):
+            return engine
+        with self._lock:
+            if i not in self._built:
+                cls = getattr(importlib.import_module("mwl_phonemizer"), engine)
+                self._built[i] = cls(dialect=self.dialect)
+            return self._built[i]
+
+    def _phonemize_word(self, word: str, lookup_word: bool = True) -> str:
+        return self._phonemize_unique_words([word], lookup_word=lookup_word)[word]
+
+    def _phonemize_unique_words(self, words: list[str], lookup_word: bool = True) -> dict[str, str]:
+        phonemes = {}
+        todo = words
+        if lookup_word:
+            phonemes = {word: self.GOLD[word.lower()] for word in words if word.lower() in self.GOLD}
+            todo = [word for word in words if word not in phonemes]
+        counts = [len(phonemes)] + [0] * len(self.engines)
+        last = len(self.engines) - 1
+        for i, threshold in enumerate(self.thresholds):
+            if not todo:
+                break
+            if i == last:
+                phonemes.update(zip(todo, self.stage(i).phonemize_words(todo, lookup_word=False)))
+                counts[i + 1] = len(todo)
+                break
+            unsure = []
+            scored = self.stage(i).phonemize_with_confidence(todo, lookup_word=False)
+            for word, (pho, confidence) in zip(todo, scored):
+                if confidence >= threshold:
+                    phonemes[word] = pho
+                else:
+                    unsure.append(word)
+            counts[i + 1] = len(todo) - len(unsure)
+            todo = unsure
+        with self._lock:
+            self._counts = [a + b for a, b in zip(self._counts, counts)]
+        return phonemes
+
+    def stage_stats(self) -> list[dict]:
+        """Words handled by GOLD and by every stage so far, with their fraction of all words"""
+        with self._lock:
+            counts = list(self._counts)
+        total = sum(counts)
+        names = ["GOLD"] + [engine if isinstance(engine, str) else type(engine).__name__ for engine in self.engines]
+        return [{"stage": name, "threshold": threshold, "words": count, "fraction": count / total if total else 0}
+                for name, threshold, count in zip(names, [None] + self.thresholds, counts)]
+
+    def reset_stats(self):
+        with self._lock:
+            self._counts = [0] * len(self._counts)
+
+
+if __name__ == "__main__":
+    phonemizer = CascadeMWL([("CRFOrthoCorrector", 0.3), ("CRFEpitranCorrector", None)])
+    text = ("Muitas lhénguas ténen proua de ls sous pergaminos antigos, "
+            "de la lhiteratura screbida hai cientos d'anhos.")
+    print(phonemizer.phonemize_sentence(text))
+    for stats in phonemizer.stage_stats():
+        print(f"{stats['stage']:<20} | {stats['words']:>5} words | {stats['fraction']:.0%}")
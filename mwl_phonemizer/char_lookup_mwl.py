@@ -47,62 +47,58 @@ class LookupTableMWL(MirandesePhonemizer):
         "Z": ["sk"],
         # "I": ["ɨ̃j̃"],  # SENDINESE
     }
+    _letters = None  # (LETTERS, translate table)
+
+    # temp representation of digraphs as individual letters
+    # the order matters, digraphs are replaced one after another (e.g. "uon" -> "uO", not "Wn")
+    DIMAP = {
+        "an": "A",
+        "en": "E",
+        "in": "I",
+        "on": "O",
+        "un": "U",
+        "rr": "R",
+        "ss": "S",
+        "lh": "ʎ",
+        "nh": "ɲ",
+        "qu": "Q",
+        "gu": "G",
+        "gue": "G",
+        "Ge": "G",
+        "ce": "Ç",
+        "ci": "C",
+        "uo": "W",
+        "çc": "Z",
+        "ge": "ʒɨ",
+    }
 
-    @staticmethod
-    def normalize(sentence: str):
+    @classmethod
+    def normalize(cls, sentence: str):
         # normalize short/long pauses to " " and "."
         sentence = (sentence.lower()
                     .replace("\t", " ")
                     .replace("-", " ")
                     .replace(",", " ")
                     .replace(";", " ")
-                    .replace(".", ".")
                     .replace("!", ".")
                     .replace("?", "."))
 
-        # temp representation of digraphs as individual letters
-        DIMAP = {
-            "an": "A",
-            "en": "E",
-            "in": "I",
-            "on": "O",
-            "un": "U",
-            "rr": "R",
-            "ss": "S",
-            "lh": "ʎ",
-            "nh": "ɲ",
-            "qu": "Q",
-            "gu": "G",
-            "gue": "G",
-            "Ge": "G",
-            "ce": "Ç",
-            "ci": "C",
-            "uo": "W",
-            "çc": "Z",
-            "ge": "ʒɨ",
-        }
-
         # normalize digraphs
-        for di, n in DIMAP.items():
+        for di, n in cls.DIMAP.items():
             sentence = sentence.replace(di, n)
         return sentence
 
     # -------------------------
     # Phonemizer interface
     # -------------------------
-    def phonemize(self, word: str, lookup_word: bool = True) -> str:
+    def _phonemize_word(self, word: str, lookup_word: bool = True) -> str:
         """Phonemize a single Mirandese word via espeak + correction rules."""
         if lookup_word and word.lower() in self.GOLD:
             return self.GOLD[word.lower()]
         word = self.normalize(word)
-        phonemes = ""
-        for idx, char in enumerate(word):
-            if char in self.LETTERS:
-                pho = self.LETTERS[char][0]
-                phonemes += pho
-            else:
-                phonemes += char
-        return phonemes
+        if self._letters is None or self._letters[0] is not self.LETTERS:
+            type(self)._letters = (self.LETTERS, str.maketrans({char: phos[0] for char, phos in self.LETTERS.items()}))
+        return word.translate(self._letters[1])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,228 @@
+"""
+mwl-phonemizer command line
+
+    mwl-phonemizer build-models [--cache-dir DIR] [--engines CRFPhonemizer CRFOrthoCorrector ...] [--force]
+    mwl-phonemizer convert-models [model.joblib ...] [--cache-dir DIR] [--remove]
+    mwl-phonemizer tune [--engine CRFOrthoCorrector] [--search grid|random] [--param c1=0.01,0.1 ...] [--folds 5]
+    mwl-phonemizer phonemize corpus.txt [-o out.txt] [--engine CRFOrthoCorrector] [--mode sentence|line] [--jobs N]
+    mwl-phonemizer epitran-table table.json [--words vocabulary.txt]
+    mwl-phonemizer compile-epitran [--code por-Latn] [--verify-words 200000]
+"""
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import sys
+import time
+
+import mwl_phonemizer
+from mwl_phonemizer.model_registry import ModelRegistry
+
+CRF_ENGINES = {
+    "CRFPhonemizer": "mwl_phonemizer.crf_mwl",
+    "CRFOrthoCorrector": "mwl_phonemizer.crf_ortho_mwl",
+    "CRFEspeakCorrector": "mwl_phonemizer.crf_espeak_mwl",
+    "CRFEpitranCorrector": "mwl_phonemizer.crf_epitran_mwl",
+}
+
+
+def build_models(args) -> int:
+    """Trains every CRF corrector into the model registry, so deployments never train at startup."""
+    registry = ModelRegistry(args.cache_dir)
+    if args.force:
+        for engine in args.engines:
+            registry.clear(engine)
+    failed = 0
+    for engine in args.engines:
+        start = time.perf_counter()
+        try:
+            cls = getattr(importlib.import_module(CRF_ENGINES[engine]), engine)
+            phonemizer = cls(model_registry=registry)
+        except Exception as e:  # missing espeak-ng / epitran should not stop the other models
+            print(f"{engine}: FAILED ({type(e).__name__}: {e})", file=sys.stderr)
+            failed += 1
+            continue
+        print(f"{engine}: {phonemizer.model_path} ({time.perf_counter() - start:.2f}s)")
+    return 1 if failed else 0
+
+
+def convert_models(args) -> int:
+    """Converts joblib models of older versions (the registry's, or the given files) to native crfsuite models."""
+    from mwl_phonemizer.crf_mwl import convert_joblib_model
+
+    registry = ModelRegistry(args.cache_dir)
+    paths = args.models or registry.legacy_models()
+    failed = 0
+    for path in paths:
+        # registry models are named <engine>-<key>.joblib
+        engine = os.path.basename(path).rsplit("-", 1)[0]
+        try:
+            output = convert_joblib_model(path, engine=engine if engine in CRF_ENGINES else None)
+        except Exception as e:  # e.g. a pickle of an incompatible sklearn_crfsuite version
+            print(f"{path}: FAILED ({type(e).__name__}: {e})", file=sys.stderr)
+            failed += 1
+            continue
+        if args.remove:
+            os.remove(path)
+        print(f"{path} -> {output}")
+    if not paths:
+        print(f"no joblib models in {registry.cache_dir}")
+    return 1 if failed else 0
+
+
+def tune(args) -> int:
+    """Cross-validates CRF hyperparameters on the gold words and trains the best configuration into the registry."""
+    from mwl_phonemizer.tuning import DEFAULT_SPACE, leaderboard_markdown, tune as tune_engine
+
+    space = dict(DEFAULT_SPACE)
+    for param in args.param or []:
+        name, _, values = param.partition("=")
+        parsed = []
+        for value in values.split(","):
+            try:
+                parsed.append(json.loads(value))
+            except ValueError:  # strings, e.g. strategy=lev,pad
+                parsed.append(value)
+        space[name] = parsed
+    start = time.perf_counter()
+    leaderboard, phonemizer = tune_engine(args.engine, space, args.search, args.trials, args.folds,
+                                          args.jobs, args.seed, ModelRegistry(args.cache_dir), args.output)
+    print(leaderboard_markdown(leaderboard[:args.top]))
+    if args.leaderboard:
+        with open(args.leaderboard, "w", encoding="utf-8") as f:
+            json.dump({"engine": args.engine, "folds": args.folds, "seed": args.seed, "leaderboard": leaderboard},
+                      f, ensure_ascii=False, indent=2)
+    best = ", ".join(f"{k}={v!r}" for k, v in leaderboard[0]["config"].items())
+    print(f"\n{args.engine}({best}): {phonemizer.model_path} ({time.perf_counter() - start:.2f}s)")
+    return 0
+
+
+def phonemize(args) -> int:
+    """Phonemizes a text file, one output line per sentence (or per input line with --mode line)."""
+    from mwl_phonemizer.streaming import iter_sentences, phonemize_stream, read_chunks
+
+    with open(args.input, encoding="utf-8") as f, \
+            (open(args.output, "w", encoding="utf-8") if args.output else contextlib.nullcontext(sys.stdout)) as out:
+        if args.mode == "sentence":
+            texts = iter_sentences(read_chunks(f))
+        else:
+            texts = (line.rstrip("\r\n") for line in f)
+        if args.jobs == 1:
+            phonemizer = getattr(mwl_phonemizer, args.engine)()
+            results = (phonemes for _, phonemes in
+                       phonemize_stream(texts, phonemizer, args.batch_size, not args.no_lookup))
+        else:
+            from mwl_phonemizer.parallel import phonemize_corpus
+            results = phonemize_corpus(texts, args.engine, jobs=args.jobs,
+                                       chunksize=args.batch_size, lookup_word=not args.no_lookup)
+        for phonemes in results:
+            out.write(phonemes + "\n")
+    return 0
+
+
+def epitran_table(args) -> int:
+    """Precomputes epitran transliterations of a vocabulary, load them with EpitranMWL(epitran_table=...)."""
+    from mwl_phonemizer.base import MirandesePhonemizer
+    from mwl_phonemizer.epitran_mwl import _EpitranTransliterator
+
+    if args.words:
+        with open(args.words, encoding="utf-8") as f:
+            words = [line.strip() for line in f if line.strip()]
+    else:
+        pho = MirandesePhonemizer()
+        words = [*pho.GOLD, *pho.RAIANO_GOLD, *pho.SENDINESE_GOLD]
+    # CRFEpitranCorrector transliterates words with "ch" spelled as "tch"
+    words = list(dict.fromkeys(words + [word.replace("ch", "tch") for word in words]))
+    start = time.perf_counter()
+    _EpitranTransliterator("por-Latn").save_table(args.output, words)
+    print(f"{len(words)} words: {args.output} ({time.perf_counter() - start:.2f}s)")
+    return 0
+
+
+def compile_epitran(args) -> int:
+    """Compiles epitran's G2P data into the in-package transducer, after checking it against epitran."""
+    from mwl_phonemizer.base import MirandesePhonemizer
+    from mwl_phonemizer.epitran_transducer import EpitranTransducer, generated_words
+
+    start = time.perf_counter()
+    transducer = EpitranTransducer.compile(args.code)
+    pho = MirandesePhonemizer()
+    words = [*pho.GOLD, *pho.RAIANO_GOLD, *pho.SENDINESE_GOLD, *generated_words(args.verify_words)]
+    mismatches = transducer.verify(words)
+    if mismatches:
+        for word, expected, got in mismatches[:20]:
+            print(f"{word!r}: epitran {expected!r}, transducer {got!r}", file=sys.stderr)
+        print(f"{len(mismatches)} of {len(words)} words differ, transducer not written", file=sys.stderr)
+        return 1
+    transducer.save(args.output)
+    print(f"{args.code}: {len(words)} words identical to epitran {transducer.epitran_version}, "
+          f"{args.output or 'written to the package'} ({time.perf_counter() - start:.2f}s)")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="mwl-phonemizer")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build-models", help=build_models.__doc__)
+    build.add_argument("--cache-dir", help="model registry directory, "
+                                           "defaults to $MWL_PHONEMIZER_CACHE or ~/.cache/mwl_phonemizer/models")
+    build.add_argument("--engines", nargs="+", choices=list(CRF_ENGINES), default=list(CRF_ENGINES))
+    build.add_argument("--force", action="store_true", help="retrain even if a matching model exists")
+    build.set_defaults(func=build_models)
+
+    convert = subparsers.add_parser("convert-models", help=convert_models.__doc__)
+    convert.add_argument("models", nargs="*", help="joblib model files, defaults to every one in the registry")
+    convert.add_argument("--cache-dir", help="model registry directory, "
+                                             "defaults to $MWL_PHONEMIZER_CACHE or ~/.cache/mwl_phonemizer/models")
+    convert.add_argument("--remove", action="store_true", help="delete the joblib files once converted")
+    convert.set_defaults(func=convert_models)
+
+    tune_ = subparsers.add_parser("tune", help=tune.__doc__)
+    tune_.add_argument("--engine", default="CRFOrthoCorrector", choices=list(CRF_ENGINES))
+    tune_.add_argument("--search", choices=["grid", "random"], default="random")
+    tune_.add_argument("--param", action="append",
+                       help="hyperparameter values to search, e.g. c1=0.01,0.1 or strategy=lev,pad, "
+                            "replaces its default values, repeat for several hyperparameters")
+    tune_.add_argument("--trials", type=int, default=20, help="configurations sampled by the random search")
+    tune_.add_argument("--folds", type=int, default=5)
+    tune_.add_argument("--jobs", type=int, default=0, help="worker processes, 0 for one per core")
+    tune_.add_argument("--seed", type=int, default=0)
+    tune_.add_argument("--cache-dir", help="model registry directory, "
+                                           "defaults to $MWL_PHONEMIZER_CACHE or ~/.cache/mwl_phonemizer/models")
+    tune_.add_argument("-o", "--output", help="also save the best model here, load it with crf_model_path")
+    tune_.add_argument("--leaderboard", help="write every configuration's scores as JSON to this file")
+    tune_.add_argument("--top", type=int, default=10, help="configurations printed")
+    tune_.set_defaults(func=tune)
+
+    pho = subparsers.add_parser("phonemize", help=phonemize.__doc__)
+    pho.add_argument("input", help="UTF-8 text file")
+    pho.add_argument("-o", "--output", help="output file, defaults to stdout")
+    # CascadeMWL needs its stages, it is not built from a name alone
+    pho.add_argument("--engine", default="CRFOrthoCorrector",
+                     choices=sorted(name for name in mwl_phonemizer.__all__ if name != "CascadeMWL"))
+    pho.add_argument("--mode", choices=["sentence", "line"], default="sentence")
+    pho.add_argument("--jobs", type=int, default=1, help="worker processes, 0 for one per core")
+    pho.add_argument("--batch-size", type=int, default=256)
+    pho.add_argument("--no-lookup", action="store_true", help="do not use the gold dictionaries")
+    pho.set_defaults(func=phonemize)
+
+    table = subparsers.add_parser("epitran-table", help=epitran_table.__doc__)
+    table.add_argument("output", help="JSON table to write")
+    table.add_argument("--words", help="vocabulary file, one word per line, defaults to the gold dictionaries")
+    table.set_defaults(func=epitran_table)
+
+    compile_ = subparsers.add_parser("compile-epitran", help=compile_epitran.__doc__)
+    compile_.add_argument("--code", default="por-Latn", help="epitran language-script code")
+    compile_.add_argument("-o", "--output", help="defaults to <code>.epitran.json in the package")
+    compile_.add_argument("--verify-words", type=int, default=200000,
+                          help="generated words checked against epitran, besides the gold words")
+    compile_.set_defaults(func=compile_epitran)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,26 @@
 from mwl_phonemizer.base import Dialects
 from mwl_phonemizer.crf_mwl import CRFPhonemizer
+from mwl_phonemizer.epitran_mwl import _EpitranTransliterator
 
 
 class CRFEpitranCorrector(CRFPhonemizer):
-    def __init__(self, *args, **kwargs):
-        import epitran
-        self.epitran = epitran.Epitran("por-Latn")
+    CACHE_TRANSFORMS = True
+
+    def __init__(self, *args, epitran_table: str | None = None, epitran_cache_size: int = 10000,
+                 use_transducer: bool = True, **kwargs):
+        self.epitran = _EpitranTransliterator("por-Latn", epitran_cache_size, epitran_table, use_transducer)
         super().__init__(*args, ignore_stress=True, **kwargs)
 
+    def transform_config(self) -> dict:
+        return {"epitran": self.epitran.version, "backend": "transducer" if self.epitran.transducer else "epitran"}
+
     def grapheme_transforms(self, word: str) -> str:
         word = word.replace("ch", "tch")
         return self.epitran.transliterate(word)
 
+    def grapheme_transforms_many(self, words: list[str]) -> list[str]:
+        return self.epitran.transliterate_many([word.replace("ch", "tch") for word in words])
+
 
 if __name__ == "__main__":
     phonemizer = CRFEpitranCorrector(dialect=Dialects.CENTRAL)
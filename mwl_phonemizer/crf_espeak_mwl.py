@@ -4,14 +4,23 @@ from mwl_phonemizer.espeak_mwl import _EspeakPhonemizer
 
 
 class CRFEspeakCorrector(CRFPhonemizer):
+    CACHE_TRANSFORMS = True
+
     def __init__(self, *args, **kwargs):
         self.espeak = _EspeakPhonemizer()
         super().__init__(*args, ignore_stress=False, **kwargs)
 
+    def transform_config(self) -> dict:
+        return {"espeak": self.espeak.version()}
+
     def grapheme_transforms(self, word: str) -> str:
         word = word.replace("ch", "tch")
         return self.espeak.phonemize_string(word)
 
+    def grapheme_transforms_many(self, words: list[str]) -> list[str]:
+        # a single espeak request for all the words
+        return self.espeak.phonemize_many([word.replace("ch", "tch") for word in words])
+
 
 if __name__ == "__main__":
     phonemizer = CRFEspeakCorrector(dialect=Dialects.CENTRAL)
@@ -1,10 +1,17 @@
+import hashlib
+import json
+import os
 import random
+import threading
 
 from mwl_phonemizer.base import MirandesePhonemizer, Dialects
-import sklearn_crfsuite
-import Levenshtein as lev
+from mwl_phonemizer.cache import WordCache
+from mwl_phonemizer.model_registry import ModelRegistry
+from mwl_phonemizer.version import VERSION_STR
 from enum import Enum
-import joblib
+
+# first bytes of a native crfsuite model file
+CRFSUITE_MAGIC = b"lCRF"
 
 
 class AlignmentStrategy(str, Enum):
@@ -18,6 +25,8 @@ def align_with_lev(espeak_seq: str, gold_seq: str):
     Returns two equal-length lists (espeak_aligned, gold_aligned),
     where gaps are represented as '+' or '-'.
     """
+    import Levenshtein as lev
+
     es = list(espeak_seq)
     gd = list(gold_seq)
 
@@ -65,6 +74,11 @@ def align_with_lev(espeak_seq: str, gold_seq: str):
     return es_aligned, gd_aligned
 
 
+def metadata_path(model_path: str) -> str:
+    """JSON metadata written next to a native crfsuite model"""
+    return f"{model_path}.json"
+
+
 def align_pad(ipa_seq: str, gold_seq: str):
     # If word and IPA lengths differ, use character-level alignment with padding
     ipa_aligned = list(ipa_seq)
@@ -77,6 +91,9 @@ def align_pad(ipa_seq: str, gold_seq: str):
 
 
 class CRFPhonemizer(MirandesePhonemizer):
+    # cache the transformed gold words in the model registry, for expensive grapheme_transforms
+    CACHE_TRANSFORMS = False
+
     def __init__(self, crf_model_path: str | None = None,
                  strategy=AlignmentStrategy.LEV,
                  algorithm='lbfgs',
@@ -87,7 +104,12 @@ class CRFPhonemizer(MirandesePhonemizer):
                  apply_manual_fixes=False,
                  ignore_stress=True,
                  train_data: list[tuple[str,str]] | None = None,
-                 *args, **kwargs):
+                 *args,
+                 use_model_registry: bool = True,
+                 model_registry: ModelRegistry | None = None,
+                 feature_cache_size: int = 10000,
+                 train: bool = True,  # False leaves the model empty unless crf_model_path exists, see tuning
+                 **kwargs):
         super().__init__(*args, **kwargs)
         self.crf_model_path = crf_model_path
         self.algorithm = algorithm
@@ -97,22 +119,105 @@ class CRFPhonemizer(MirandesePhonemizer):
         self.all_possible_transitions = all_possible_transitions
         self.strategy = strategy
         self.manual_fixes = apply_manual_fixes
-        self.model = None
+        self.model: bytes | None = None  # native crfsuite model, see tagger()
+        self.model_metadata: dict = {}
+        self.model_path = None  # file the model was loaded from or saved to
         self.ignore_stress = ignore_stress
+        # pycrfsuite.ItemSequence of recently tagged transformed words
+        self.feature_cache = WordCache(feature_cache_size) if feature_cache_size > 0 else None
+        self._taggers = threading.local()  # one pycrfsuite.Tagger per thread, see tagger()
         if crf_model_path and os.path.exists(crf_model_path):
             self.load_model(crf_model_path)
+        elif not train:
+            pass
+        elif use_model_registry:
+            self._load_or_train(train_data, model_registry or ModelRegistry())
         elif train_data:
             self.train_crf(train_data)
         else:
             self.train_on_gold()
 
-    def train_on_gold(self):
+    def _load_or_train(self, train_data: list[tuple[str, str]] | None, registry: ModelRegistry):
+        # pretrained models are looked up by a hash of training data and hyperparameters,
+        # and of the espeak / epitran version the gold words are transformed with
+        params = self.training_config()
+        if self.transform_config():
+            params["transforms"] = self.transform_config()
+        key = registry.key(type(self).__name__, params, train_data or self.GOLD)
+        registry_path = registry.model_path(type(self).__name__, key)
+        if os.path.exists(registry_path):
+            self.load_model(registry_path)
+            return
+        if train_data:
+            self.train_crf(train_data)
+        else:
+            self.train_on_gold(registry)
+        try:
+            self.save_model(registry_path)
+        except OSError:
+            pass  # read-only cache directory, keep the trained model in memory only
+
+    def training_config(self) -> dict:
+        """Hyperparameters the CRF model is trained with."""
+        return {"algorithm": self.algorithm,
+                "c1": self.c1,
+                "c2": self.c2,
+                "max_iterations": self.max_iterations,
+                "all_possible_transitions": self.all_possible_transitions,
+                "strategy": self.strategy,
+                "ignore_stress": self.ignore_stress}
+
+    def engine_config(self) -> dict:
+        return {**super().engine_config(),
+                **self.training_config(),
+                "apply_manual_fixes": self.manual_fixes}
+
+    def _model_data(self) -> list[bytes]:
+        # the model in memory, also when it was trained and never saved
+        return [self.model] if self.model else []
+
+    def train_on_gold(self, registry: ModelRegistry | None = None):
         # Prepare training data from GOLD dictionary
-        train_data = [(self.grapheme_transforms(word), gold)
-                      for word, gold in self.GOLD.items()]
+        words = list(self.GOLD)
+        train_data = [pair for word, tx_word in zip(words, self._transform_gold(words, registry))
+                      for pair in self.gold_training_pairs(word, tx_word)]
         # Train CRF
         self.train_crf(train_data)
 
+    def _transform_gold(self, words: list[str], registry: ModelRegistry | None = None) -> list[str]:
+        """
+        grapheme_transforms_many of the gold words, cached in the registry next to the models.
+
+        The cache is keyed by the words and transform_config() (the espeak / epitran version),
+        not the hyperparameters, so retraining with other hyperparameters does not transform
+        the words again, while upgrading the tool does.
+        """
+        if registry is None or not self.CACHE_TRANSFORMS:
+            return self.grapheme_transforms_many(words)
+        key = registry.key(type(self).__name__, self.transform_config(), words)
+        path = registry.transforms_path(type(self).__name__, key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                cached = json.load(f)
+            if all(word in cached for word in words):
+                return [cached[word] for word in words]
+        except (OSError, ValueError):
+            pass
+        transformed = self.grapheme_transforms_many(words)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(dict(zip(words, transformed)), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # read-only cache directory
+        return transformed
+
+    def transform_config(self) -> dict:
+        """Version of the tool behind grapheme_transforms, the transformed words change with it"""
+        return {}
+
     def _apply_postfixes(self, word: str, phonemes: str) -> str:
         # due to the way alignmenet is approximated
         # the CRF often learns to drop the last phoneme
@@ -179,30 +284,60 @@ class CRFPhonemizer(MirandesePhonemizer):
             features.append(feats)
         return features
 
+    @staticmethod
+    def crfsuite_attributes(str_input) -> list[list[str]]:
+        """
+        extract_features as crfsuite attributes, "name:value" strings formatted the way pycrfsuite
+        formats feature dicts. is_first / is_last are only emitted where they are true, a false
+        flag has weight 0 and never changes a prediction. The windows are sliced from one padded sequence.
+        """
+        padded = ("", "", "", *str_input, "", "", "")
+        attributes = [["char:" + char, "prev_char:" + p1, "next_char:" + n1, "prev_char2:" + p2,
+                       "next_char2:" + n2, "prev_char3:" + p3, "next_char3:" + n3]
+                      for p3, p2, p1, char, n1, n2, n3 in zip(padded, padded[1:], padded[2:], padded[3:],
+                                                              padded[4:], padded[5:], padded[6:])]
+        if attributes:  # right after char, in extract_features order
+            attributes[-1].insert(1, "is_last")
+            attributes[0].insert(1, "is_first")
+        return attributes
+
+    def item_sequence(self, tx_word: str):
+        """pycrfsuite.ItemSequence of a transformed word, ready for tagging, memoized"""
+        if self.feature_cache is not None:
+            items = self.feature_cache.get(None, tx_word)
+            if items is not None:
+                return items
+        import pycrfsuite
+        items = pycrfsuite.ItemSequence(self.crfsuite_attributes(tx_word))
+        if self.feature_cache is not None:
+            self.feature_cache.put(None, tx_word, items)
+        return items
+
+    def training_sequence(self, str_input: str, gold_ipa: str,
+                          strategy: AlignmentStrategy | None = None) -> tuple[list[dict], list[str]]:
+        """(features, labels) of one training pair, the input aligned character by character to its gold IPA"""
+        gold_ipa = self.strip_markers(gold_ipa)
+        str_input = self.strip_markers(str_input)
+        if self.ignore_stress:
+            str_input = self.strip_stress(str_input)
+            gold_ipa = self.strip_stress(gold_ipa)
+        if (strategy or self.strategy) == AlignmentStrategy.LEV:
+            ipa_aligned, gold_aligned = align_with_lev(str_input, gold_ipa)
+        else:
+            ipa_aligned, gold_aligned = align_pad(str_input, gold_ipa)
+        return self.extract_features(ipa_aligned), gold_aligned
+
+    def gold_training_pairs(self, word: str, tx_word: str) -> list[tuple[str, str]]:
+        """(input, gold IPA) pairs a gold word is trained with, given its grapheme_transforms"""
+        return [(tx_word, self.GOLD[word])]
+
     def train_crf(self, train_data):
-        X, y = [], []
         random.shuffle(train_data)
-        for str_input, gold_ipa in train_data:
-            gold_ipa = self.strip_markers(gold_ipa)
-            str_input = self.strip_markers(str_input)
-            if self.ignore_stress:
-                str_input = self.strip_stress(str_input)
-                gold_ipa = self.strip_stress(gold_ipa)
-            if self.strategy == AlignmentStrategy.LEV:
-                ipa_aligned, gold_aligned = align_with_lev(str_input, gold_ipa)
-            else:
-                ipa_aligned, gold_aligned = align_pad(str_input, gold_ipa)
-            X.append(self.extract_features(ipa_aligned))
-            y.append(gold_aligned)
-
-        self.model = sklearn_crfsuite.CRF(
-            algorithm=self.algorithm,
-            c1=self.c1,
-            c2=self.c2,
-            max_iterations=self.max_iterations,
-            all_possible_transitions=self.all_possible_transitions
-        )
-        self.model.fit(X, y)
+        X, y = zip(*(self.training_sequence(str_input, gold_ipa) for str_input, gold_ipa in train_data))
+        self.model = fit_crfsuite(list(X), list(y), **{k: v for k, v in self.training_config().items()
+                                                       if k not in ("strategy", "ignore_stress")})
+        self.model_metadata = self._metadata(train_data)
+        self._model_changed()
 
         if self.crf_model_path:
             self.save_model(self.crf_model_path)
@@ -211,18 +346,73 @@ class CRFPhonemizer(MirandesePhonemizer):
         # help pronounciation with grapheme transformations
         return str_input
 
-    def phonemize(self, word: str, lookup_word: bool = True) -> str:
+    def grapheme_transforms_many(self, words: list[str]) -> list[str]:
+        """grapheme_transforms of every word, subclasses calling external tools batch them here"""
+        return [self.grapheme_transforms(word) for word in words]
+
+    def _phonemize_word(self, word: str, lookup_word: bool = True) -> str:
         word = word.lower().strip()
         if lookup_word and word in self.GOLD:
             return self.GOLD[word]
-        if not self.model:
-            raise ValueError("CRF model is not trained or loaded.")
+        tagger = self.tagger()
         tx_word = self.grapheme_transforms(word)
-        features = self.extract_features(tx_word)
-        pred = self.model.predict_single(features)
-        phones = ''.join(pred)
+        phones = ''.join(tagger.tag(self.item_sequence(tx_word)))
         return self._postprocess(word, phones)
 
+    def phonemize_many(self, words: list[str], lookup_word: bool = True) -> list[str]:
+        """
+        Phonemizes many words at once, output is identical to calling phonemize() per word.
+
+        Words not looked up in GOLD are transformed by a single grapheme_transforms_many
+        call and tagged in one loop by this thread's tagger.
+        """
+        return [phonemes for phonemes, _ in self._tag_many(words, lookup_word)]
+
+    def phonemize_with_confidence(self, words: list[str], lookup_word: bool = True) -> list[tuple[str, float]]:
+        """
+        (phonemes, confidence) of every word, the confidence of a tagged word is the lowest
+        marginal probability of its predicted labels, P(label | word) at its least certain character.
+        """
+        return self._tag_many(words, lookup_word, marginals=True)
+
+    def _tag_many(self, words: list[str], lookup_word: bool, marginals: bool = False) -> list[tuple[str, float]]:
+        words = [word.lower().strip() for word in words]
+        outputs = [(self.GOLD.get(word, ""), 1.0) if lookup_word else ("", 1.0) for word in words]
+        todo = [i for i, word in enumerate(words) if not lookup_word or word not in self.GOLD]
+        if not todo:
+            return outputs
+        tagger = self.tagger()
+        item_sequence = self.item_sequence
+        for i, tx_word in zip(todo, self.grapheme_transforms_many([words[i] for i in todo])):
+            labels = tagger.tag(item_sequence(tx_word))
+            confidence = 1.0
+            if marginals:
+                for t, label in enumerate(labels):
+                    confidence = min(confidence, tagger.marginal(label, t))
+            outputs[i] = (self._postprocess(words[i], ''.join(labels)), confidence)
+        return outputs
+
+    def _phonemize_unique_words(self, words: list[str], lookup_word: bool = True) -> dict[str, str]:
+        return dict(zip(words, self.phonemize_many(words, lookup_word)))
+
+    def tagger(self):
+        """
+        This thread's pycrfsuite.Tagger, opened once on the in-memory model.
+
+        A Tagger must not be used by two threads at once, so every thread opens its own and
+        one phonemizer can serve a multithreaded server. All of them share the model buffer.
+        Taggers are reopened after the model is retrained or reloaded.
+        """
+        if not self.model:
+            raise ValueError("CRF model is not trained or loaded.")
+        local = self._taggers
+        if getattr(local, "model", None) is not self.model:
+            import pycrfsuite
+            tagger = pycrfsuite.Tagger()
+            tagger.open_inmemory(self.model)
+            local.tagger, local.model = tagger, self.model
+        return local.tagger
+
     def _postprocess(self, word: str, phones: str) -> str:
         # remove artifacts from alignment
         phones = phones.replace(".", "")
@@ -230,11 +420,87 @@ class CRFPhonemizer(MirandesePhonemizer):
             phones = self._apply_postfixes(word, phones)
         return phones
 
+    def _metadata(self, train_data: list[tuple[str, str]]) -> dict:
+        """What a model was trained with, saved next to it"""
+        pairs = json.dumps(sorted(map(list, train_data)), ensure_ascii=False)
+        return {"engine": type(self).__name__,
+                "version": VERSION_STR,
+                "training_config": self.training_config(),
+                "train_data_sha256": hashlib.sha256(pairs.encode("utf-8")).hexdigest(),
+                "train_data_size": len(train_data)}
+
+    @staticmethod
+    def _write_model(path: str, model: bytes, metadata: dict):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # write then rename, so concurrent processes never load a half written model,
+        # metadata first, so a model is never seen without it
+        for target, data in ((metadata_path(path), json.dumps(metadata, ensure_ascii=False, indent=1).encode("utf-8")),
+                             (path, model)):
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, target)
+
     def save_model(self, path: str):
-        joblib.dump(self.model, path)
+        """Writes the native crfsuite model to `path` and its metadata to `path`.json"""
+        if not self.model:
+            raise ValueError("CRF model is not trained or loaded.")
+        self._write_model(path, self.model, self.model_metadata)
+        self.model_path = path
 
     def load_model(self, path: str):
-        self.model = joblib.load(path)
+        """
+        Loads a native crfsuite model, a read-only buffer the taggers are opened on.
+        Nothing is unpickled, models are independent of the sklearn_crfsuite version.
+        """
+        with open(path, "rb") as f:
+            model = f.read()
+        if not model.startswith(CRFSUITE_MAGIC):
+            raise ValueError(f"{path} is not a crfsuite model, "
+                             f"convert joblib models with `mwl-phonemizer convert-models`")
+        try:
+            with open(metadata_path(path), encoding="utf-8") as f:
+                self.model_metadata = json.load(f)
+        except FileNotFoundError:
+            self.model_metadata = {}
+        self.model = model
+        self.model_path = path
+        self._model_changed()
+
+
+def fit_crfsuite(X: list[list[dict]], y: list[list[str]], algorithm: str = "lbfgs", c1: float | None = 0.1,
+                 c2: float | None = 0.1, max_iterations: int = 100, all_possible_transitions: bool = False) -> bytes:
+    """Trains a CRF with sklearn_crfsuite and returns the native crfsuite model, without sklearn_crfsuite's state"""
+    import sklearn_crfsuite
+    crf = sklearn_crfsuite.CRF(
+        algorithm=algorithm,
+        c1=c1,
+        c2=c2,
+        max_iterations=max_iterations,
+        all_possible_transitions=all_possible_transitions
+    )
+    crf.fit(X, y)
+    with open(crf.modelfile.name, "rb") as f:
+        return f.read()
+
+
+def convert_joblib_model(path: str, output: str | None = None, engine: str | None = None) -> str:
+    """
+    Converts a sklearn_crfsuite.CRF pickled with joblib (the old model format) into a native
+    crfsuite model, written next to it with the .crfsuite extension, and its metadata.
+    Only the hyperparameters kept in the pickle end up in the metadata. Returns the new path.
+    """
+    import joblib
+    crf = joblib.load(path)
+    with open(crf.modelfile.name, "rb") as f:
+        model = f.read()
+    output = output or os.path.splitext(path)[0] + ModelRegistry.EXTENSION
+    metadata = {"engine": engine,
+                "training_config": {param: getattr(crf, param) for param in
+                                    ("algorithm", "c1", "c2", "max_iterations", "all_possible_transitions")},
+                "converted_from": os.path.basename(path)}
+    CRFPhonemizer._write_model(output, model, metadata)
+    return output
 
 
 if __name__ == "__main__":
@@ -5,11 +5,17 @@ from mwl_phonemizer.orthography_hand_rules import OrthographyRulesMWL
 class CRFOrthoCorrector(CRFPhonemizer):
     def __init__(self, *args, **kwargs):
         self.phonemizer = OrthographyRulesMWL()
-        DATASET = [(self.phonemizer.phonemize(word, lookup_word=False), gold)
-                   for word, gold in self.phonemizer.GOLD.items()]
-        DATASET += [(gold, gold)  # so it learns not to touch correct phones
-                   for word, gold in self.phonemizer.GOLD.items()]
-        super().__init__(*args, ignore_stress=True, train_data=DATASET, **kwargs)
+        # trained on the gold words, their rule outputs built by train_on_gold only on a registry miss
+        super().__init__(*args, ignore_stress=True, **kwargs)
+
+    def transform_config(self) -> dict:
+        # the hand rules and their data files, hashed
+        return {"rules": self.phonemizer.fingerprint()}
+
+    def gold_training_pairs(self, word: str, tx_word: str) -> list[tuple[str, str]]:
+        gold = self.GOLD[word]
+        return [(tx_word, gold),
+                (gold, gold)]  # so it learns not to touch correct phones
 
     def grapheme_transforms(self, word: str) -> str:
         return self.phonemizer.phonemize(word, lookup_word=False)
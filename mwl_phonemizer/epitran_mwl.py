@@ -1,19 +1,129 @@
 """experiment using epitran for pt-PT phonemization and then correcting the output"""
-import re
+import json
+import os
+import threading
 from collections import Counter
+from importlib import metadata
+
 from mwl_phonemizer.base import MirandesePhonemizer
+from mwl_phonemizer.cache import WordCache
+from mwl_phonemizer.epitran_transducer import EpitranTransducer, default_transducer_path
+from mwl_phonemizer.rule_pipeline import PT_IPA_CORRECTIONS
+
+
+def _epitran_version() -> str | None:
+    try:
+        return metadata.version("epitran")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+class _EpitranTransliterator:
+    """
+    epitran transliteration with a bounded LRU memo and an optional precomputed table.
+
+    Words are transliterated by the in-package EpitranTransducer compiled from epitran's
+    data (see epitran_transducer.py), epitran.Epitran is only used when there is no compiled
+    transducer for the language or use_transducer=False, and then only loaded on the first miss.
+    Every word is transliterated once and then served from memory, words in the table
+    (see save_table) are never transliterated at all.
+    """
+
+    def __init__(self, code: str = "por-Latn", cache_size: int = 10000, table_path: str | None = None,
+                 use_transducer: bool = True):
+        self.code = code
+        self.cache = WordCache(cache_size) if cache_size > 0 else None
+        self.transducer: EpitranTransducer | None = None
+        if use_transducer and os.path.exists(default_transducer_path(code)):
+            self.transducer = EpitranTransducer.load(code=code)
+        # version of the epitran data the words are transliterated with
+        self.version = self.transducer.epitran_version if self.transducer else _epitran_version()
+        self.table: dict[str, str] = self.load_table(table_path, code, self.version) if table_path else {}
+        self._epitran = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load_table(path: str, code: str = "por-Latn", version: str | None = None) -> dict[str, str]:
+        """Reads a table written by save_table, refusing tables of another language or epitran version."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("code") != code:
+            raise ValueError(f"epitran table {path} is for '{data.get('code')}', not '{code}'")
+        if version is not None and data.get("epitran") != version:
+            raise ValueError(f"epitran table {path} was built with epitran {data.get('epitran')}, "
+                             f"not {version}, rebuild it")
+        return data["table"]
+
+    def save_table(self, path: str, words: list[str]):
+        """Precomputes the transliteration of `words` (e.g. the known vocabulary) into a table file."""
+        table = dict(zip(words, self.transliterate_many(words)))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"code": self.code, "epitran": self.version, "table": table},
+                      f, ensure_ascii=False, indent=0)
+        os.replace(tmp_path, path)
+
+    def _transliterate(self, word: str) -> str:
+        if self.transducer is not None:
+            return self.transducer.transliterate(word)
+        with self._lock:
+            if self._epitran is None:
+                import epitran
+                self._epitran = epitran.Epitran(self.code)
+            return self._epitran.transliterate(word)
+
+    def transliterate(self, word: str) -> str:
+        if word in self.table:
+            return self.table[word]
+        if self.cache is not None:
+            ipa = self.cache.get(self.code, word)
+            if ipa is not None:
+                return ipa
+        ipa = self._transliterate(word)
+        if self.cache is not None:
+            self.cache.put(self.code, word, ipa)
+        return ipa
+
+    def transliterate_many(self, words: list[str]) -> list[str]:
+        """Transliterates a list of words, one output per word, every distinct word only once."""
+        unique = list(dict.fromkeys(words))
+        found = {word: self.table[word] for word in unique if word in self.table}
+        missing = [word for word in unique if word not in found]
+        if missing and self.cache is not None:
+            found.update(self.cache.get_many(self.code, missing))
+            missing = [word for word in missing if word not in found]
+        new = {word: self._transliterate(word) for word in missing}
+        if new and self.cache is not None:
+            self.cache.put_many(self.code, new)
+        found.update(new)
+        return [found[word] for word in words]
 
 
 class EpitranMWL(MirandesePhonemizer):
-    def __init__(self, *args, **kwargs):
+    CASE_SENSITIVE = True  # the backend transliterates the word as written
+
+    def __init__(self, *args,
+                 epitran_table: str | None = None,  # precomputed transliterations, see _EpitranTransliterator.save_table
+                 epitran_cache_size: int = 10000,
+                 use_transducer: bool = True,  # False to transliterate with epitran itself
+                 **kwargs):
         super().__init__(*args, **kwargs)
-        import epitran
-        self.pho = epitran.Epitran("por-Latn")
+        self.epitran_table = epitran_table
+        self.pho = _EpitranTransliterator("por-Latn", epitran_cache_size, epitran_table, use_transducer)
+
+    def engine_config(self) -> dict:
+        return {**super().engine_config(),
+                "epitran": self.pho.version,
+                "backend": "transducer" if self.pho.transducer else "epitran"}
+
+    def _model_files(self) -> list[str]:
+        return [self.epitran_table] if self.epitran_table else []
 
     # -------------------------
     # Phonemizer interface
     # -------------------------
-    def phonemize(self, word: str, lookup_word: bool = True) -> str:
+    def _phonemize_word(self, word: str, lookup_word: bool = True) -> str:
         """Phonemize a single Mirandese word via epitran + correction rules."""
         if lookup_word and word.lower() in self.GOLD:
             return self.GOLD[word.lower()]
@@ -21,101 +131,23 @@ class EpitranMWL(MirandesePhonemizer):
         corrected = self.apply_with_ortho(epitran_ipa, word)
         return corrected
 
+    def _phonemize_unique_words(self, words: list[str], lookup_word: bool = True) -> dict[str, str]:
+        """Transliterates all words that are not in the gold dictionary in one call."""
+        phonemes = {}
+        if lookup_word:
+            phonemes = {word: self.GOLD[word.lower()] for word in words if word.lower() in self.GOLD}
+        missing = [word for word in words if word not in phonemes]
+        for word, epitran_ipa in zip(missing, self.pho.transliterate_many(missing)):
+            phonemes[word] = self.apply_with_ortho(epitran_ipa, word)
+        return phonemes
+
     # -------------------------
     # Hand rules
     # -------------------------
     @staticmethod
     def apply_with_ortho(ipa: str, ortho: str) -> str:
-        out = ipa
-
-        # handle common standalone words, like determinants
-        if ortho == "l":
-            return "l̩"
-        elif ortho == "ls":
-            return "l̩s̺"
-
-        # -------------------------
-        # Global substitutions
-        # -------------------------
-        # Rhotics
-        out = out.replace("ɹ", "ɾ").replace("ʁ", "r")
-
-        # Intervocalic lenition (optional, add exceptions if needed)
-        out = re.sub(r'([aeiouɐɛɔuiɨ])b([aeiouɐɛɔuiɨ])', r'β', out)
-        out = re.sub(r'([aeiouɐɛɔuiɨ])d([aeiouɐɛɔuiɨ])', r'ð', out)
-        out = re.sub(r'([aeiouɐɛɔuiɨ])g([aeiouɐɛɔuiɨ])', r'ɣ', out)
-
-        # -------------------------
-        # Palatalization / Nasals
-        # -------------------------
-        out = re.sub(r"lh", "ʎ", out)
-        out = re.sub(r"nh", "ɲ", out)
-
-        # -------------------------
-        # Diphthongs and glides
-        # -------------------------
-        out = out.replace("aɪ", "aj")
-        out = out.replace("eɪ", "ej")
-        out = out.replace("oʊ", "ow")
-        out = out.replace("au", "aw")
-
-        # -------------------------
-        # Nasal vowels
-        # -------------------------
-        out = out.replace("iŋ", "ĩ")
-        out = out.replace("uŋ", "ũ")
-        out = out.replace("ãŋ", "ɐ̃")
-        out = out.replace("eɪŋ", "ej̃")
-        out = out.replace("aɪŋ", "aj̃")
-        out = out.replace("oʊŋ", "ow̃")
-
-        # -------------------------
-        # Sibilants
-        # -------------------------
-        if out.endswith("ʃ"):
-            out = out[:-1] + "s̺"
-
-        # sibilant context rules
-        out = re.sub(r'^s(?=[^aeiouɐɛɔuiɨ])', 's̺', out)
-        out = re.sub(r's(?=[eiɨ])', 's̻', out)
-
-        # -------------------------
-        # Latin clusters / consonant corrections
-        # -------------------------
-        out = re.sub(r'^(pl|kl|fl)', 'tʃ', out)
-        out = re.sub(r'^l(?=[aeiouɐɛɔuiɨ])', 'ʎ', out)
-
-        # -------------------------
-        # Final vowel shifts
-        # -------------------------
-        out = re.sub(r'o$', 'u', out)
-
-        # -------------------------
-        # Orthography-specific retroflex sibilants
-        # -------------------------
-        if "ç" in ortho.lower() or re.search(r"c[ei]", ortho.lower()):
-            out = out.replace("s̺", "s̻").replace("z̺", "z̻")
-
-        # -------------------------
-        # Stress normalization: place before main vowel
-        # -------------------------
-        out = re.sub(r'ˈ([^aeiouɐɛɔuiɨ]*)([aeiouɐɛɔuiɨ])', r'ˈ\2', out)
-
-        # Misc fixes based on experimental output comparison
-        out = out.replace("ɨɾə", "ɨɾ")
-        out = out.replace("bˈiɾ", "ˈβiɾ")
-        out = out.replace("ʃk", "s̺k")
-        if ortho.startswith("be") and out.startswith("bˌe"):
-            out = "bɨ" + out[3:]
-        if ortho.startswith("amb") and out.startswith("ɐ̃mb"):
-            out = "ɐ̃b" + out[3:]
-        if ortho.endswith("uç") and out.endswith("us"):
-            out = out[:-1] + "s̻"
-        if out.endswith("oŋ"):
-            out = out[:-2] + "õ"
-        if out.endswith("ɾədʊ"):
-            out = out[-4:] + "ɾdu"
-        return out
+        """Corrects Portuguese IPA towards Mirandese, see rule_pipeline.PT_IPA_RULES"""
+        return PT_IPA_CORRECTIONS.apply(ipa, ortho)
 
     def evaluate_against_base(self, limit=None, detailed=False, show_changes=False):
         pairs = list(self.GOLD.items())
@@ -0,0 +1,225 @@
+"""epitran G2P compiled into an in-package transducer, run without importing epitran"""
+import csv
+import json
+import os
+import random
+import re
+import unicodedata
+
+# characters epitran's case insensitive grapheme match is checked against when compiling
+_MAX_CODEPOINT = 0x110000
+# a rule target made of plain strings, e.g. "m|n"
+_LITERALS = re.compile(r"[^\\()\[\]{}.*+?^$|]+(\|[^\\()\[\]{}.*+?^$|]+)*")
+
+
+def default_transducer_path(code: str = "por-Latn") -> str:
+    return os.path.join(os.path.dirname(__file__), f"{code}.epitran.json")
+
+
+class EpitranTransducer:
+    """
+    epitran's simple G2P for one language, compiled into plain data.
+
+    epitran lowercases and decomposes (NFD) the word, strips diacritics, applies the
+    pre-processor rules, maps graphemes by greedy longest match, applies the post-processor
+    rules and composes (NFC) the result. Here the rules are regexes compiled once with the
+    re module and the map is a single alternation, no epitran, panphon or regex import needed.
+
+    Build it offline with `compile` (or `mwl-phonemizer compile-epitran`), which refuses to
+    write a transducer whose output differs from epitran.
+    """
+    HANGUL = re.compile("[가-힣]")
+
+    def __init__(self, data: dict):
+        self.code = data["code"]
+        self.epitran_version = data["epitran"]
+        self.data = data
+        self.strip = str.maketrans("", "", "".join(data["strip"]))
+        self.count = data["count"]
+        self.pre = [self._compile_rule(*rule) for rule in data["pre"]]
+        self.post = [self._compile_rule(*rule) for rule in data["post"]]
+        self.g2p: dict[str, str] = data["map"]
+        # epitran tries longer graphemes first, in file order otherwise
+        self.regex = re.compile("|".join(sorted(self.g2p, key=len, reverse=True)))
+        self.fold = str.maketrans(data["fold"])
+        self._epitran = None
+
+    @staticmethod
+    def _compile_rule(pattern: str, b: str, requires: list[str] | None = None) -> tuple:
+        """(regex, template, requires), epitran rewrites a rule match as X + b + Y"""
+        return re.compile(pattern), r"\g<X>" + b.replace("\\", r"\\") + r"\g<Y>", tuple(requires or ())
+
+    @classmethod
+    def load(cls, path: str | None = None, code: str = "por-Latn") -> "EpitranTransducer":
+        with open(path or default_transducer_path(code), encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def save(self, path: str | None = None):
+        path = path or default_transducer_path(self.code)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+    # -------------------------
+    # Compilation (needs epitran)
+    # -------------------------
+    @staticmethod
+    def _read_rules(path) -> list[list[str]]:
+        """Parses an epitran pre/post-processor file into [pattern, b, requires], as epitran.rules.Rules does."""
+        if not path.is_file():
+            return []
+        rules = []
+        symbols = {}
+        with path.open("r", encoding="utf-8") as f:
+            for i, line in enumerate(f):
+                line = unicodedata.normalize("NFD", line.strip())
+                if not line or re.match(r"\s*%", line):
+                    continue
+                s = re.match(r"(?P<symbol>::\w+::)\s*=\s*(?P<value>.+)", line)
+                if s:
+                    symbols[s.group("symbol")] = s.group("value")
+                    continue
+                while re.search(r"::\w+::", line):
+                    symbol = re.search(r"::\w+::", line).group(0)
+                    if symbol not in symbols:
+                        raise ValueError(f"{path}, line {i + 1}: undefined symbol {symbol}")
+                    line = line.replace(symbol, symbols[symbol])
+                r = re.match(r"(\S+)\s*->\s*(\S+)\s*/\s*(\S*)\s*[_]\s*(\S*)", line)
+                if r is None:
+                    raise ValueError(f"{path}, line {i + 1}: '{line}' cannot be parsed")
+                a, b, X, Y = r.groups()
+                if re.search(r"[?]P[<]sw1[>].+[?]P[<]sw2[>]", a):
+                    raise ValueError(f"{path}, line {i + 1}: metathesis rules are not supported")
+                X, Y = X.replace("#", "^"), Y.replace("#", "$")
+                a, b = a.replace("0", ""), b.replace("0", "")
+                # when `a` is a plain alternation of strings, words without any of them are skipped
+                requires = a.split("|") if a and _LITERALS.fullmatch(a) else None
+                rules.append([rf"(?P<X>{X})(?P<a>{a})(?P<Y>{Y})", b, requires])
+        return rules
+
+    @staticmethod
+    def _case_variants(graphemes) -> dict[str, str]:
+        """
+        Characters epitran's case insensitive (regex.I) grapheme match treats as one of the
+        characters of the graphemes, e.g. "ſ" for "s". They survive lowercasing.
+        """
+        import regex
+        chars = sorted(set("".join(graphemes)))
+        everything = "".join(chr(c) for c in range(_MAX_CODEPOINT) if not 0xD800 <= c <= 0xDFFF)
+        variants = {}
+        for char in chars:
+            for variant in regex.findall(regex.escape(char), everything, regex.I):
+                if variant != char and variant.lower() == variant:
+                    variants[variant] = char
+        return variants
+
+    @classmethod
+    def compile(cls, code: str = "por-Latn") -> "EpitranTransducer":
+        """Compiles the epitran data files of `code` (only simple, non-reversed G2P is supported)."""
+        from importlib import metadata, resources
+
+        import regex
+        data_dir = resources.files("epitran").joinpath("data")
+
+        g2p = {}
+        with data_dir.joinpath("map", f"{code}.csv").open(encoding="utf-8") as f:
+            reader = csv.reader(f)
+            if next(reader) != ["Orth", "Phon"]:
+                raise ValueError(f"unexpected header in the {code} epitran map")
+            for graph, phon in reader:
+                graph = unicodedata.normalize("NFD", graph)
+                phon = re.sub("[˩˨˧˦˥]", "", unicodedata.normalize("NFD", phon))
+                if graph in g2p:
+                    raise ValueError(f"one-to-many epitran mapping for '{graph}' in {code}")
+                g2p[graph] = phon
+
+        strip = []
+        strip_path = data_dir.joinpath("strip", f"{code}.csv")
+        if strip_path.is_file():
+            with strip_path.open(encoding="utf-8") as f:
+                strip = [diacritic for [diacritic] in csv.reader(f)]
+
+        return cls({
+            "code": code,
+            "epitran": metadata.version("epitran"),
+            # epitran passes regex.U as the count of every rule substitution
+            "count": int(regex.U),
+            "strip": strip,
+            "pre": cls._read_rules(data_dir.joinpath("pre", f"{code}.txt")),
+            "post": cls._read_rules(data_dir.joinpath("post", f"{code}.txt")),
+            "map": g2p,
+            "fold": cls._case_variants(g2p)
+        })
+
+    def verify(self, words: list[str]) -> list[tuple[str, str, str]]:
+        """(word, epitran, transducer) for every word the two transliterate differently"""
+        import epitran
+        reference = epitran.Epitran(self.code)
+        return [(word, expected, got) for word in words
+                for expected, got in [(reference.transliterate(word), self.transliterate(word))]
+                if expected != got]
+
+    # -------------------------
+    # Transliteration
+    # -------------------------
+    def _map(self, text: str) -> str:
+        folded = text.translate(self.fold)
+        if folded == text:
+            return self.regex.sub(lambda m: self.g2p.get(m.group(), m.group()), text)
+        # a case variant matched a grapheme, epitran copies such matches unchanged
+        out = []
+        end = 0
+        for m in self.regex.finditer(folded):
+            source = text[m.start():m.end()]
+            out.append(text[end:m.start()])
+            out.append(self.g2p.get(source, source))
+            end = m.end()
+        out.append(text[end:])
+        return "".join(out)
+
+    def transliterate(self, word: str) -> str:
+        if self.HANGUL.search(word):
+            # epitran decomposes hangul syllables into jamo first, leave that to epitran
+            if self._epitran is None:
+                import epitran
+                self._epitran = epitran.Epitran(self.code)
+            return self._epitran.transliterate(word)
+        text = unicodedata.normalize("NFD", word.lower()).translate(self.strip)
+        text = self._rewrite(self.pre, text)
+        text = self._map(text)
+        text = self._rewrite(self.post, text)
+        return unicodedata.normalize("NFC", text)
+
+    def _rewrite(self, rules: list[tuple], text: str) -> str:
+        for regex, template, requires in rules:
+            for required in requires:
+                if required in text:
+                    break
+            else:
+                if requires:
+                    continue
+            text = regex.sub(template, text, self.count)
+        return text
+
+
+def generated_words(n: int, seed: int = 0) -> list[str]:
+    """Random words for verification, syllable like as well as random characters, mixed case and accents"""
+    rnd = random.Random(seed)
+    onsets = ["", "b", "c", "ch", "ç", "d", "f", "g", "gu", "h", "j", "l", "lh", "m", "n", "nh", "p", "qu",
+              "r", "rr", "s", "ss", "t", "v", "x", "z", "br", "cr", "pl", "tr", "sc", "st"]
+    nuclei = ["a", "á", "â", "ã", "à", "e", "é", "ê", "i", "í", "o", "ó", "ô", "õ", "u", "ú", "y",
+              "ai", "au", "ãe", "ão", "ei", "eu", "iu", "oi", "ou", "õe", "ui", "uo", "ie"]
+    codas = ["", "", "", "s", "r", "l", "n", "m", "x", "z", "ç"]
+    chars = "abcdefghijklmnopqrstuvwxyzáâãàéêíóôõúçüñABCÇÉÃKſİ'-. 0123"
+    words = []
+    for i in range(n):
+        if i % 4 == 3:
+            word = "".join(rnd.choice(chars) for _ in range(rnd.randint(1, 12)))
+        else:
+            word = "".join(rnd.choice(onsets) + rnd.choice(nuclei) + rnd.choice(codas)
+                           for _ in range(rnd.randint(1, 4)))
+            if rnd.random() < 0.1:
+                word = word.capitalize() if rnd.random() < 0.5 else word.upper()
+        words.append(word)
+    return words
@@ -1,15 +1,317 @@
 """experiment using espeak for pt-PT phonemization and then correcting the output"""
-import re
+import ctypes
+import ctypes.util
+import os
+import queue
+import shutil
 import subprocess
+import threading
+import time
 from collections import Counter
 
 from mwl_phonemizer.base import MirandesePhonemizer
+from mwl_phonemizer.rule_pipeline import PT_IPA_CORRECTIONS
+
+
+class EspeakError(RuntimeError):
+    """Raised when espeak-ng is not available or fails to phonemize."""
+
+
+class _EspeakWorker:
+    """
+    A long-lived espeak-ng process for a single voice.
+
+    espeak-ng reads stdin line by line, so many words can be streamed through
+    one process, one word per line, instead of starting a process per word.
+    A sentinel line is written after every request; its (known) output marks
+    where the answer ends, which is how output lines are correlated with input.
+    The process is restarted if it crashes, and after a fork.
+    """
+    SENTINEL = "mwlsentinel"
+
+    def __init__(self, lang: str = "pt", timeout: float = 10.0):
+        self.lang = lang
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._process: subprocess.Popen | None = None
+        self._lines: queue.Queue | None = None
+        self._pid: int | None = None
+        self._sentinel_ipa: str | None = None
+
+    def _start(self):
+        command = ['espeak-ng', '-q', '-x', '--ipa', '-v', self.lang]
+        if shutil.which("stdbuf"):
+            # espeak-ng does not flush stdout after every line when writing to a pipe
+            command = ['stdbuf', '-oL'] + command
+        try:
+            self._process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+                bufsize=1
+            )
+        except FileNotFoundError:
+            raise EspeakError(
+                "espeak-ng command not found. Please ensure espeak-ng is installed "
+                "and available in your system's PATH."
+            )
+        self._pid = os.getpid()
+        # a reader thread keeps draining stdout, so big requests can not deadlock on a full pipe
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read_stdout,
+                         args=(self._process.stdout, self._lines),
+                         daemon=True).start()
+        self._write([self.SENTINEL])
+        self._sentinel_ipa = self._readline().strip()
+
+    @staticmethod
+    def _read_stdout(stdout, lines: queue.Queue):
+        for line in stdout:
+            lines.put(line)
+        lines.put(None)  # EOF, the process died
+
+    def _is_alive(self) -> bool:
+        return (self._process is not None
+                and self._pid == os.getpid()
+                and self._process.poll() is None)
+
+    def close(self):
+        # never touch a process inherited from the parent after a fork
+        if self._process is not None and self._pid == os.getpid():
+            self._process.kill()
+            self._process.wait()
+        self._process = None
+
+    def _write(self, lines: list[str]):
+        try:
+            self._process.stdin.write("".join(line + "\n" for line in lines))
+            self._process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise EspeakError(f"espeak-ng process died: {e}")
+
+    def _readline(self) -> str:
+        try:
+            line = self._lines.get(timeout=self.timeout)
+        except queue.Empty:
+            raise EspeakError(f"espeak-ng did not answer within {self.timeout} seconds")
+        if line is None:
+            raise EspeakError("espeak-ng process died")
+        return line
+
+    def _request(self, lines: list[str]) -> list[str]:
+        """Writes lines plus the sentinel and returns the raw output lines before the sentinel."""
+        self._write(lines + [self.SENTINEL])
+        output = []
+        while True:
+            line = self._readline()
+            if line.strip() == self._sentinel_ipa:
+                return output
+            output.append(line)
+
+    def _phonemize_lines(self, lines: list[str]) -> list[str]:
+        output = self._request(lines)
+        if len(output) == len(lines):
+            return [line.strip() for line in output]
+        # some input produced zero or several output lines, the sentinel keeps one request per word exact
+        return ["".join(self._request([line])).strip() for line in lines]
+
+    def phonemize_lines(self, lines: list[str]) -> list[str]:
+        """Phonemizes every line, returning exactly one output per input line."""
+        lines = [line.replace("\n", " ") for line in lines]
+        with self._lock:
+            for retry in (True, False):
+                try:
+                    if not self._is_alive():
+                        self.close()
+                        self._start()
+                    return self._phonemize_lines(lines)
+                except EspeakError:
+                    self.close()
+                    if not retry:
+                        raise
+
+
+class _EspeakWorkerPool:
+    """
+    A pool of persistent espeak-ng workers, ``size`` per voice, shared by concurrent callers.
+    Workers are only started when first needed.
+    """
+
+    def __init__(self, size: int = 1, timeout: float = 10.0):
+        self.size = size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle: dict[str, queue.Queue] = {}
+
+    def _workers(self, lang: str) -> queue.Queue:
+        with self._lock:
+            if lang not in self._idle:
+                self._idle[lang] = queue.Queue()
+                for _ in range(self.size):
+                    self._idle[lang].put(_EspeakWorker(lang, timeout=self.timeout))
+            return self._idle[lang]
+
+    def phonemize_lines(self, lines: list[str], lang: str = "pt") -> list[str]:
+        workers = self._workers(lang)
+        worker = workers.get()  # blocks while every worker for this voice is busy
+        try:
+            return worker.phonemize_lines(lines)
+        finally:
+            workers.put(worker)
+
+    def close(self):
+        with self._lock:
+            for workers in self._idle.values():
+                while not workers.empty():
+                    workers.get().close()
+            self._idle = {}
+
+
+class _EspeakVoice(ctypes.Structure):
+    """espeak_VOICE from speak_lib.h"""
+    _fields_ = [
+        ("name", ctypes.c_char_p),
+        ("languages", ctypes.c_char_p),
+        ("identifier", ctypes.c_char_p),
+        ("gender", ctypes.c_ubyte),
+        ("age", ctypes.c_ubyte),
+        ("variant", ctypes.c_ubyte),
+        ("xx1", ctypes.c_ubyte),
+        ("score", ctypes.c_int),
+        ("spare", ctypes.c_void_p),
+    ]
+
+
+class _EspeakLibrary:
+    """
+    In-process binding to libespeak-ng through ctypes, calling espeak_TextToPhonemes directly.
+
+    libespeak-ng keeps its voice and translator in global state and is not reentrant,
+    so every call into the library holds a single process-wide lock.
+    """
+    AUDIO_OUTPUT_SYNCHRONOUS = 0x02
+    INITIALIZE_DONT_EXIT = 0x8000
+    CHARS_UTF8 = 1
+    PHONEMES_IPA = 0x02
+
+    _lock = threading.Lock()
+    _loaded: dict[str, "_EspeakLibrary"] = {}
+
+    def __init__(self, library_path: str, data_path: str | None = None):
+        try:
+            self._lib = ctypes.cdll.LoadLibrary(library_path)
+        except OSError as e:
+            raise EspeakError(f"could not load {library_path}: {e}")
+        self._lib.espeak_Initialize.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_char_p, ctypes.c_int]
+        self._lib.espeak_Initialize.restype = ctypes.c_int
+        self._lib.espeak_SetVoiceByName.argtypes = [ctypes.c_char_p]
+        self._lib.espeak_SetVoiceByName.restype = ctypes.c_int
+        self._lib.espeak_SetVoiceByProperties.argtypes = [ctypes.POINTER(_EspeakVoice)]
+        self._lib.espeak_SetVoiceByProperties.restype = ctypes.c_int
+        self._lib.espeak_TextToPhonemes.argtypes = [ctypes.POINTER(ctypes.c_void_p), ctypes.c_int, ctypes.c_int]
+        self._lib.espeak_TextToPhonemes.restype = ctypes.c_char_p
+        self._lib.espeak_Info.argtypes = [ctypes.POINTER(ctypes.c_char_p)]
+        self._lib.espeak_Info.restype = ctypes.c_char_p
+        sample_rate = self._lib.espeak_Initialize(self.AUDIO_OUTPUT_SYNCHRONOUS, 0,
+                                                  data_path.encode() if data_path else None,
+                                                  self.INITIALIZE_DONT_EXIT)
+        if sample_rate <= 0:
+            raise EspeakError(f"espeak_Initialize failed for {library_path}")
+        self._voice = None
+
+    @classmethod
+    def find_library(cls) -> str | None:
+        return ctypes.util.find_library("espeak-ng")
+
+    @classmethod
+    def load(cls, library_path: str | None = None, data_path: str | None = None) -> "_EspeakLibrary":
+        """Returns the process-wide binding for a shared library, initializing it once."""
+        library_path = library_path or cls.find_library()
+        if not library_path:
+            raise EspeakError("libespeak-ng shared library not found")
+        with cls._lock:
+            if library_path not in cls._loaded:
+                cls._loaded[library_path] = cls(library_path, data_path)
+            return cls._loaded[library_path]
+
+    def version(self) -> str:
+        return self._lib.espeak_Info(None).decode("utf-8", errors="replace")
+
+    def _set_voice(self, lang: str):
+        if lang == self._voice:
+            return
+        # same lookup as the espeak-ng command line: voice name first, then language
+        if self._lib.espeak_SetVoiceByName(lang.encode()) != 0:
+            voice = _EspeakVoice(languages=lang.lower().encode())
+            if self._lib.espeak_SetVoiceByProperties(ctypes.byref(voice)) != 0:
+                raise EspeakError(f"espeak-ng voice not found: '{lang}'")
+        self._voice = lang
+
+    def _text_to_phonemes(self, text: str) -> str:
+        buffer = ctypes.create_string_buffer(text.encode("utf-8"))
+        text_ptr = ctypes.c_void_p(ctypes.addressof(buffer))
+        clauses = []
+        # every call translates one clause and advances text_ptr, which becomes NULL at the end
+        while text_ptr.value:
+            phonemes = self._lib.espeak_TextToPhonemes(ctypes.byref(text_ptr), self.CHARS_UTF8, self.PHONEMES_IPA)
+            if phonemes:
+                clauses.append(phonemes.decode("utf-8", errors="replace").strip())
+        return "\n".join(clause for clause in clauses if clause)
+
+    def phonemize_many(self, words: list[str], lang: str = "pt") -> list[str]:
+        with self._lock:
+            self._set_voice(lang)
+            return [self._text_to_phonemes(word) for word in words]
 
 
 class _EspeakPhonemizer:
     """
-    A phonemizer class that uses the espeak-ng command-line tool to convert text into phonemes.
+    A phonemizer class that uses espeak-ng to convert text into phonemes.
+
+    Backends:
+        - "library": libespeak-ng loaded in-process through ctypes
+        - "worker": words streamed through a pool of persistent espeak-ng processes
+        - "subprocess": a new espeak-ng process per call
+        - "auto": "library" when the shared library is present, "worker" otherwise
+
+    If the worker backend keeps failing, calls fall back to "subprocess" for
+    POOL_RETRY_SECONDS, then the workers are tried again.
     """
+    BACKENDS = ("auto", "library", "worker", "subprocess")
+    POOL_RETRY_SECONDS = 60.0
+    _command_version: str | None = None  # of the espeak-ng command, see version()
+
+    def __init__(self, backend: str = "auto", workers: int = 1, timeout: float = 10.0,
+                 library_path: str | None = None, data_path: str | None = None):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"unknown espeak backend: '{backend}', expected one of {self.BACKENDS}")
+        self.backend = backend
+        self.workers = workers
+        self.timeout = timeout
+        self.library_path = library_path
+        self.data_path = data_path
+        self.library: _EspeakLibrary | None = None
+        self.pool: _EspeakWorkerPool | None = None
+        self._pool_failed_at: float | None = None  # time.monotonic() of the last worker failure
+        self._resolved = False
+
+    def _resolve_backend(self):
+        # done on first use, so creating a phonemizer never loads espeak
+        if self._resolved:
+            return
+        if self.backend in ("auto", "library"):
+            try:
+                self.library = _EspeakLibrary.load(self.library_path, self.data_path)
+            except EspeakError:
+                if self.backend == "library":
+                    raise
+        if self.library is None and self.backend in ("auto", "worker"):
+            self.pool = _EspeakWorkerPool(self.workers, timeout=self.timeout)
+        self._resolved = True
 
     @staticmethod
     def _run_espeak_command(args: list[str], input_text: str = None, check: bool = True) -> str:
@@ -29,7 +331,7 @@ class _EspeakPhonemizer:
         Raises:
             EspeakError: If espeak-ng command is not found, or if the subprocess call fails.
         """
-        command: List[str] = ['espeak-ng'] + args
+        command: list[str] = ['espeak-ng'] + args
         try:
             process: subprocess.CompletedProcess = subprocess.run(
                 command,
@@ -55,20 +357,61 @@ class _EspeakPhonemizer:
         except Exception as e:
             raise EspeakError(f"An unexpected error occurred while running espeak-ng: {e}")
 
+    def version(self) -> str:
+        """espeak-ng version and the backend that runs it, e.g. "library 1.51", outputs depend on both"""
+        self._resolve_backend()
+        if self.library is not None:
+            return f"library {self.library.version()}"
+        backend = "worker" if self.pool is not None else "subprocess"
+        if _EspeakPhonemizer._command_version is None:
+            # "eSpeak NG text-to-speech: 1.51  Data at: ...", the command is the same for every instance
+            output = self._run_espeak_command(["--version"])
+            _EspeakPhonemizer._command_version = output.split(":")[1].split()[0] if ":" in output else output
+        return f"{backend} {_EspeakPhonemizer._command_version}"
+
     def phonemize_string(self, text: str, lang: str = "pt") -> str:
+        self._resolve_backend()
+        if self.library is not None:
+            return self.library.phonemize_many([text], lang)[0]
+        if self.pool is not None and "\n" not in text:
+            return self.phonemize_many([text], lang)[0]
         return self._run_espeak_command(
             ['-q', '-x', '--ipa', '-v', lang],
             input_text=text
         )
 
+    def phonemize_many(self, words: list[str], lang: str = "pt") -> list[str]:
+        """Phonemizes a list of words, one output per word."""
+        if not words:
+            return []
+        self._resolve_backend()
+        if self.library is not None:
+            return self.library.phonemize_many(words, lang)
+        if self.pool is not None and (self._pool_failed_at is None or
+                                      time.monotonic() - self._pool_failed_at >= self.POOL_RETRY_SECONDS):
+            try:
+                phonemes = self.pool.phonemize_lines(words, lang)
+                self._pool_failed_at = None
+                return phonemes
+            except EspeakError:
+                # the worker failed even after a restart, it closed itself and restarts on its next use,
+                # until then calls run in subprocesses
+                self._pool_failed_at = time.monotonic()
+        return [self._run_espeak_command(['-q', '-x', '--ipa', '-v', lang], input_text=word)
+                for word in words]
+
 
 class EspeakMWL(MirandesePhonemizer):
+    CASE_SENSITIVE = True  # the backend transliterates the word as written
     pho = _EspeakPhonemizer()
 
+    def engine_config(self) -> dict:
+        return {**super().engine_config(), "espeak": self.pho.version()}
+
     # -------------------------
     # Phonemizer interface
     # -------------------------
-    def phonemize(self, word: str, lookup_word: bool = True) -> str:
+    def _phonemize_word(self, word: str, lookup_word: bool = True) -> str:
         """Phonemize a single Mirandese word via espeak + correction rules."""
         if lookup_word and word.lower() in self.GOLD:
             return self.GOLD[word.lower()]
@@ -76,101 +419,24 @@ class EspeakMWL(MirandesePhonemizer):
         corrected = self._apply_with_ortho(espeak_ipa, word)
         return corrected
 
+    def _phonemize_unique_words(self, words: list[str], lookup_word: bool = True) -> dict[str, str]:
+        """Streams all words that are not in the gold dictionary through espeak in one request."""
+        phonemes = {}
+        if lookup_word:
+            phonemes = {word: self.GOLD[word.lower()] for word in words if word.lower() in self.GOLD}
+        missing = [word for word in words if word not in phonemes]
+        espeak_ipas = self.pho.phonemize_many(missing, "pt-PT")
+        for word, espeak_ipa in zip(missing, espeak_ipas):
+            phonemes[word] = self._apply_with_ortho(espeak_ipa, word)
+        return phonemes
+
     # -------------------------
     # Hand rules
     # -------------------------
     @staticmethod
     def _apply_with_ortho(ipa: str, ortho: str) -> str:
-        out = ipa
-
-        # handle common standalone words, like determinants
-        if ortho == "l":
-            return "l̩"
-        elif ortho == "ls":
-            return "l̩s̺"
-
-        # -------------------------
-        # Global substitutions
-        # -------------------------
-        # Rhotics
-        out = out.replace("ɹ", "ɾ").replace("ʁ", "r")
-
-        # Intervocalic lenition (optional, add exceptions if needed)
-        out = re.sub(r'([aeiouɐɛɔuiɨ])b([aeiouɐɛɔuiɨ])', r'β', out)
-        out = re.sub(r'([aeiouɐɛɔuiɨ])d([aeiouɐɛɔuiɨ])', r'ð', out)
-        out = re.sub(r'([aeiouɐɛɔuiɨ])g([aeiouɐɛɔuiɨ])', r'ɣ', out)
-
-        # -------------------------
-        # Palatalization / Nasals
-        # -------------------------
-        out = re.sub(r"lh", "ʎ", out)
-        out = re.sub(r"nh", "ɲ", out)
-
-        # -------------------------
-        # Diphthongs and glides
-        # -------------------------
-        out = out.replace("aɪ", "aj")
-        out = out.replace("eɪ", "ej")
-        out = out.replace("oʊ", "ow")
-        out = out.replace("au", "aw")
-
-        # -------------------------
-        # Nasal vowels
-        # -------------------------
-        out = out.replace("iŋ", "ĩ")
-        out = out.replace("uŋ", "ũ")
-        out = out.replace("ãŋ", "ɐ̃")
-        out = out.replace("eɪŋ", "ej̃")
-        out = out.replace("aɪŋ", "aj̃")
-        out = out.replace("oʊŋ", "ow̃")
-
-        # -------------------------
-        # Sibilants
-        # -------------------------
-        if out.endswith("ʃ"):
-            out = out[:-1] + "s̺"
-
-        # sibilant context rules
-        out = re.sub(r'^s(?=[^aeiouɐɛɔuiɨ])', 's̺', out)
-        out = re.sub(r's(?=[eiɨ])', 's̻', out)
-
-        # -------------------------
-        # Latin clusters / consonant corrections
-        # -------------------------
-        out = re.sub(r'^(pl|kl|fl)', 'tʃ', out)
-        out = re.sub(r'^l(?=[aeiouɐɛɔuiɨ])', 'ʎ', out)
-
-        # -------------------------
-        # Final vowel shifts
-        # -------------------------
-        out = re.sub(r'o$', 'u', out)
-
-        # -------------------------
-        # Orthography-specific retroflex sibilants
-        # -------------------------
-        if "ç" in ortho.lower() or re.search(r"c[ei]", ortho.lower()):
-            out = out.replace("s̺", "s̻").replace("z̺", "z̻")
-
-        # -------------------------
-        # Stress normalization: place before main vowel
-        # -------------------------
-        out = re.sub(r'ˈ([^aeiouɐɛɔuiɨ]*)([aeiouɐɛɔuiɨ])', r'ˈ\2', out)
-
-        # Misc fixes based on experimental output comparison
-        out = out.replace("ɨɾə", "ɨɾ")
-        out = out.replace("bˈiɾ", "ˈβiɾ")
-        out = out.replace("ʃk", "s̺k")
-        if ortho.startswith("be") and out.startswith("bˌe"):
-            out = "bɨ" + out[3:]
-        if ortho.startswith("amb") and out.startswith("ɐ̃mb"):
-            out = "ɐ̃b" + out[3:]
-        if ortho.endswith("uç") and out.endswith("us"):
-            out = out[:-1] + "s̻"
-        if out.endswith("oŋ"):
-            out = out[:-2] + "õ"
-        if out.endswith("ɾədʊ"):
-            out = out[-4:] + "ɾdu"
-        return out
+        """Corrects Portuguese IPA towards Mirandese, see rule_pipeline.PT_IPA_RULES"""
+        return PT_IPA_CORRECTIONS.apply(ipa, ortho)
 
     def evaluate_against_base(self, limit=None, detailed=False, show_changes=False):
         pairs = list(self.GOLD.items())
@@ -0,0 +1,73 @@
+import hashlib
+import json
+import os
+
+from mwl_phonemizer.version import VERSION_STR
+
+
+def default_cache_dir() -> str:
+    """$MWL_PHONEMIZER_CACHE, or mwl_phonemizer/models under the user cache directory"""
+    if os.environ.get("MWL_PHONEMIZER_CACHE"):
+        return os.path.expanduser(os.environ["MWL_PHONEMIZER_CACHE"])
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join("~", ".cache")
+    return os.path.join(os.path.expanduser(cache_home), "mwl_phonemizer", "models")
+
+
+class ModelRegistry:
+    """
+    Trained CRF models saved under a cache directory.
+
+    Each model is stored per corrector class and keyed by a hash of its training
+    data, hyperparameters and alignment strategy, so constructors can load a
+    matching model instantly and only train on a miss.
+    """
+    EXTENSION = ".crfsuite"  # native crfsuite model, with its metadata in a .crfsuite.json file
+    METADATA_EXTENSION = EXTENSION + ".json"
+    TRANSFORMS_EXTENSION = ".transforms.json"
+    # models pickled with joblib by older versions, see `mwl-phonemizer convert-models`
+    LEGACY_EXTENSION = ".joblib"
+
+    def __init__(self, cache_dir: str | None = None):
+        self.cache_dir = os.path.expanduser(cache_dir) if cache_dir else default_cache_dir()
+
+    @staticmethod
+    def key(engine: str, params: dict, train_data) -> str:
+        """Hash of the package version, corrector class, hyperparameters and training data."""
+        payload = json.dumps({"version": VERSION_STR,
+                              "engine": engine,
+                              "params": params,
+                              "train_data": train_data},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def model_path(self, engine: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{engine}-{key[:16]}{self.EXTENSION}")
+
+    def transforms_path(self, engine: str, key: str) -> str:
+        """transformed training words of a corrector, see CRFPhonemizer.grapheme_transforms_many"""
+        return os.path.join(self.cache_dir, f"{engine}-{key[:16]}{self.TRANSFORMS_EXTENSION}")
+
+    def models(self) -> list[str]:
+        """Paths of every model in the registry."""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return sorted(os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir)
+                      if f.endswith(self.EXTENSION))
+
+    def legacy_models(self) -> list[str]:
+        """Paths of every joblib model left by older versions."""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return sorted(os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir)
+                      if f.endswith(self.LEGACY_EXTENSION))
+
+    def clear(self, engine: str | None = None):
+        """Removes the models (old joblib ones too) and cached transforms of one corrector or of all of them."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for f in os.listdir(self.cache_dir):
+            if not f.endswith((self.EXTENSION, self.METADATA_EXTENSION, self.TRANSFORMS_EXTENSION,
+                               self.LEGACY_EXTENSION)):
+                continue
+            if engine is None or f.startswith(f"{engine}-"):
+                os.remove(os.path.join(self.cache_dir, f))
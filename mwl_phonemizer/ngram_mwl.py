@@ -1,26 +1,88 @@
+import json
+import mmap
+import os
 import re
+import sys
+from array import array
+from bisect import bisect_left
 from collections import defaultdict, Counter
 from mwl_phonemizer.base import MirandesePhonemizer, Dialects
 
 
+class _MappedTable:
+    """
+    One order of a model loaded by NgramMWLPhonemizer.load, read-only views of the sorted key,
+    best phoneme id, count and total arrays of the model file. Lookups binary search the keys
+    in place, nothing is copied, so every process mapping the file shares its pages.
+    """
+
+    def __init__(self, keys, phoneme_ids, counts, totals, phonemes: list[str]):
+        self.keys = keys
+        self.phoneme_ids = phoneme_ids
+        self.counts = counts
+        self.totals = totals
+        self.phonemes = phonemes
+
+    def get(self, key: int) -> tuple[str, int, int] | None:
+        i = bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return None
+        return self.phonemes[self.phoneme_ids[i]], self.counts[i], self.totals[i]
+
+    def __getitem__(self, key: int) -> tuple[str, int, int]:
+        entry = self.get(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry
+
+    def __iter__(self):
+        return iter(self.keys)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def values(self):
+        return (self.__getitem__(key) for key in self.keys)
+
+
 class NgramMWLPhonemizer(MirandesePhonemizer):
     """
     Mirandese Phonemizer using a statistical N-gram model
     learned from Grapheme-Phoneme alignments.
     """
 
-    def __init__(self, n: int = 4, *args, **kwargs):
+    MAGIC = b"MWLNGRM2"
+    SMOOTHING = ("witten_bell", "mle")
+    VECTORIZE_MIN_BATCH = 32
+
+    def __init__(self, n: int = 4, *args, smoothing: str = "witten_bell", model_path: str | None = None, **kwargs):
         """
         Initializes the N-gram model.
         Args:
             gold_data (dict): The GOLD dictionary {ortho: ipa}.
             n (int): The size of the N-gram (e.g., n=3 uses 2 preceding graphemes).
+            smoothing (str): "witten_bell" interpolates every order with the orders below it,
+                "mle" takes the most frequent phoneme of the longest seen context.
+                Unseen contexts back off to shorter ones in both cases.
+            model_path (str): frozen model file, loaded if it exists, else written after training
         """
         super().__init__(*args, **kwargs)
+        if smoothing not in self.SMOOTHING:
+            raise ValueError(f"smoothing must be one of {self.SMOOTHING}, got {smoothing!r}")
         self.n = n
+        self.smoothing = smoothing
         self.g2p_model = defaultdict(Counter)
         # Padding tokens for context at word boundaries (e.g., <S><S><S> for n=4)
         self.padding = ["<S>"] * (n - 1)
+        # frozen model, see finalize()
+        self.grapheme_ids: dict[str, int] = {}
+        # one table per order, tables[k - 1] is keyed by k-1 context graphemes + the grapheme
+        self.tables: list[dict[int, tuple[str, int, int]] | _MappedTable] | None = None
+        self._np_tables = None  # numpy view of the tables for phonemize_many
+        self.model_path = None
+        if model_path and os.path.exists(model_path):
+            self.load(model_path)
+            return
         # Train the model immediately on initialization
         if self.dialect == Dialects.RAIANO:
             self.train({**self.GOLD, **self.RAIANO_GOLD})
@@ -28,6 +90,15 @@ class NgramMWLPhonemizer(MirandesePhonemizer):
             self.train({**self.GOLD, **self.SENDINESE_GOLD})
         else:
             self.train(self.GOLD)
+        self.finalize()
+        if model_path:
+            self.save(model_path)
+
+    def engine_config(self) -> dict:
+        return {**super().engine_config(), "n": self.n, "smoothing": self.smoothing}
+
+    def _model_files(self) -> list[str]:
+        return [self.model_path] if self.model_path else []
 
     # -----------------------------------------------
     # 1. Grapheme-Phoneme Alignment (Simplified)
@@ -76,7 +147,11 @@ class NgramMWLPhonemizer(MirandesePhonemizer):
     # -----------------------------------------------
 
     def train(self, gold_data: dict):
-        """Populates the g2p_model with counts from the GOLD data."""
+        """
+        Populates the g2p_model with counts from the GOLD data for every order 1..n in a single pass,
+        the order of a (context, g) key is len(context) + 1. Call finalize() afterwards.
+        """
+        self.tables = None
         for ortho, ipa in gold_data.items():
             ortho = ortho.lower()
 
@@ -95,20 +170,142 @@ class NgramMWLPhonemizer(MirandesePhonemizer):
                 # The current grapheme to be mapped
                 g = graphemes_sequence[i]
 
-                # The context: N-1 preceding graphemes
-                context = tuple(padded_graphemes[i: i + self.n - 1])
-
                 # The target phoneme
                 p = phonemes_sequence[i]
 
                 # Store the count: P(p | context, g) is approximated by frequency
-                self.g2p_model[(context, g)][p] += 1
+                # The context of order k: the k-1 graphemes preceding g
+                for k in range(1, self.n + 1):
+                    context = tuple(padded_graphemes[i + self.n - k: i + self.n - 1])
+                    self.g2p_model[(context, g)][p] += 1
 
     # -----------------------------------------------
-    # 3. Prediction (N-gram Lookup)
+    # 3. Frozen model (interned graphemes, packed keys)
     # -----------------------------------------------
 
-    def phonemize(self, word: str, lookup_word=False) -> str:
+    def finalize(self):
+        """
+        Freezes the trained counts into one read-only lookup table per order.
+
+        Graphemes are interned to integer IDs (<S> padding is 0) and every (context, g) key is
+        packed into one integer, base len(graphemes), mapping to (best phoneme, its count, total count).
+
+        The best phoneme is precomputed per key. With Witten-Bell smoothing it is the argmax of
+            P(p | h) = (c(h, p) + T(h) * P(p | h')) / (c(h) + T(h))
+        where h' drops the oldest context grapheme and T(h) is the number of distinct phonemes seen after h,
+        order 1 (the grapheme alone) is the maximum likelihood estimate. Ties go to the higher order count,
+        then to the phoneme seen first in training, like most_common(1).
+        """
+        graphemes = {"<S>": 0}
+        for context, g in self.g2p_model:
+            for gr in context + (g,):
+                graphemes.setdefault(gr, len(graphemes))
+        self.grapheme_ids = graphemes
+        tables = [{} for _ in range(self.n)]
+        dists = {}
+        # lower orders first, every order interpolates with the one below it
+        for context, g in sorted(self.g2p_model, key=lambda key: len(key[0])):
+            counts = self.g2p_model[(context, g)]
+            total = counts.total()
+            if self.smoothing == "witten_bell" and context:
+                # every phoneme seen after h was also counted after h'
+                lower = dists[(context[1:], g)]
+                types = len(counts)
+                dist = {p: (counts[p] + types * lower_p) / (total + types) for p, lower_p in lower.items()}
+            else:
+                dist = {p: c / total for p, c in counts.items()}
+            if len(context) < self.n - 1:
+                dists[(context, g)] = dist
+            best_p = max(dist, key=lambda p: (dist[p], counts[p]))
+            tables[len(context)][self._pack([graphemes[gr] for gr in context + (g,)])] = \
+                (best_p, counts[best_p], total)
+        self.tables = tables
+        self._model_changed()
+
+    def _pack(self, ids: list[int]) -> int:
+        key = 0
+        base = len(self.grapheme_ids)
+        for gid in ids:
+            key = key * base + gid
+        return key
+
+    def save(self, path: str):
+        """
+        Writes the frozen model: magic, header length, JSON header (n, smoothing, graphemes, phonemes,
+        table sizes), padding to 8 bytes, then for every order the little endian arrays
+        keys (u64), best phoneme ids, best counts and totals (u32).
+        """
+        if self.tables is None:
+            self.finalize()
+        if len(self.grapheme_ids) ** self.n >= 2 ** 64:
+            raise ValueError(f"n={self.n} with {len(self.grapheme_ids)} graphemes does not fit 64 bit keys")
+        phonemes = sorted({entry[0] for table in self.tables for entry in table.values()})
+        phoneme_ids = {p: i for i, p in enumerate(phonemes)}
+        arrays = []
+        for table in self.tables:
+            keys = sorted(table)
+            arrays += [array("Q", keys),
+                       array("I", [phoneme_ids[table[k][0]] for k in keys]),
+                       array("I", [table[k][1] for k in keys]),
+                       array("I", [table[k][2] for k in keys])]
+        if sys.byteorder != "little":
+            for arr in arrays:
+                arr.byteswap()
+        header = json.dumps({"n": self.n, "smoothing": self.smoothing, "graphemes": list(self.grapheme_ids),
+                             "phonemes": phonemes, "sizes": [len(table) for table in self.tables]},
+                            ensure_ascii=False).encode("utf-8")
+        header += b" " * (-(len(self.MAGIC) + 4 + len(header)) % 8)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.MAGIC)
+            f.write(len(header).to_bytes(4, "little"))
+            f.write(header)
+            for arr in arrays:
+                arr.tofile(f)
+        os.replace(tmp_path, path)
+        self.model_path = path
+
+    def load(self, path: str):
+        """
+        Loads a model written by save(). The file is memory mapped and its arrays are used in
+        place (see _MappedTable), workers loading the same file share one copy of the tables.
+        """
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:len(self.MAGIC)] != self.MAGIC:
+            mm.close()
+            raise ValueError(f"{path} is not a frozen N-gram model")
+        offset = len(self.MAGIC) + 4
+        header_len = int.from_bytes(mm[len(self.MAGIC):offset], "little")
+        header = json.loads(mm[offset:offset + header_len].decode("utf-8"))
+        offset += header_len
+        view = memoryview(mm)
+        arrays = []
+        for size in header["sizes"]:
+            for typecode in "QIII":
+                nbytes = size * array(typecode).itemsize
+                if sys.byteorder == "little":
+                    arrays.append(view[offset:offset + nbytes].cast(typecode))
+                else:  # the file is little endian, big endian machines get a swapped copy
+                    arr = array(typecode, view[offset:offset + nbytes].tobytes())
+                    arr.byteswap()
+                    arrays.append(arr)
+                offset += nbytes
+        phonemes = header["phonemes"]
+        self.n = header["n"]
+        self.smoothing = header["smoothing"]
+        self.padding = ["<S>"] * (self.n - 1)
+        self.grapheme_ids = {g: i for i, g in enumerate(header["graphemes"])}
+        self.tables = [_MappedTable(*arrays[i:i + 4], phonemes) for i in range(0, len(arrays), 4)]
+        self.model_path = path
+        self._model_changed()
+
+    # -----------------------------------------------
+    # 4. Prediction (N-gram Lookup)
+    # -----------------------------------------------
+
+    def _phonemize_word(self, word: str, lookup_word=False) -> str:
         """
         Phonemize a single word using the trained N-gram model.
         """
@@ -118,31 +315,55 @@ class NgramMWLPhonemizer(MirandesePhonemizer):
         if word == "l":
             return "l̩"
 
-        # The grapheme tokenization should ideally mirror the alignment logic
-        temp_g = word.lower().replace('lh', 'L̃').replace('nh', 'Ñ').replace('ch', 'Tʃ')
-        graphemes = list(temp_g)
-        # Reverse the temporary substitution for the final grapheme list used in N-gram context lookup
-        graphemes = [g.replace('L̃', 'lh').replace('Ñ', 'nh').replace('Tʃ', 'ch') for g in graphemes]
-
-        # Use the tokenized graphemes for prediction and padding context
-        padded_graphemes = self.padding + graphemes
+        graphemes = self._graphemes(word)
         predicted_phonemes = []
 
         # 1. Predict phonemes for each grapheme
-        for i in range(len(graphemes)):
-            g = graphemes[i]
-            # Context is the N-1 characters preceding the current grapheme
-            context = tuple(padded_graphemes[i: i + self.n - 1])
-            key = (context, g)
-
-            if key in self.g2p_model:
-                # Maximum Likelihood Estimate (MLE): choose the most frequent phoneme
-                best_p = self.g2p_model[key].most_common(1)[0][0]
-                predicted_phonemes.append(best_p)
+        for g, entry in zip(graphemes, self._entries(graphemes)):
+            if entry is not None:
+                # the smoothed most likely phoneme, precomputed by finalize()
+                predicted_phonemes.append(entry[0])
             else:
-                # Back-off (Simplest form: Grapheme = Phoneme)
+                # unknown grapheme: Grapheme = Phoneme
                 predicted_phonemes.append(g)
 
+        return self._finish(predicted_phonemes)
+
+    def _entries(self, graphemes: list[str]) -> list[tuple[str, int, int] | None]:
+        """(best phoneme, its count, total count) of the longest seen context of every grapheme, None if unknown"""
+        if self.tables is None:
+            self.finalize()
+
+        # Use the tokenized graphemes for prediction and padding context, unknown graphemes are -1
+        padded_ids = [0] * (self.n - 1) + [self.grapheme_ids.get(g, -1) for g in graphemes]
+        entries = []
+        for i in range(len(graphemes)):
+            # Context is the N-1 graphemes preceding the current grapheme
+            ids = padded_ids[i: i + self.n]
+            entry = None
+            # Back-off: one probe per order, from the full context down to the grapheme alone
+            for k in range(self.n, 0, -1):
+                if ids[-1] == -1:
+                    break
+                key_ids = ids[self.n - k:]
+                if -1 in key_ids:
+                    continue
+                entry = self.tables[k - 1].get(self._pack(key_ids))
+                if entry is not None:
+                    break
+            entries.append(entry)
+        return entries
+
+    @staticmethod
+    def _graphemes(word: str) -> list[str]:
+        # The grapheme tokenization should ideally mirror the alignment logic
+        temp_g = word.lower().replace('lh', 'L̃').replace('nh', 'Ñ').replace('ch', 'Tʃ')
+        graphemes = list(temp_g)
+        # Reverse the temporary substitution for the final grapheme list used in N-gram context lookup
+        return [g.replace('L̃', 'lh').replace('Ñ', 'nh').replace('Tʃ', 'ch') for g in graphemes]
+
+    @staticmethod
+    def _finish(predicted_phonemes: list[str]) -> str:
         ipa_sequence = "".join(predicted_phonemes)
 
         # 2. Add Stress (This still requires a hand-rule or a separate stress model)
@@ -156,6 +377,114 @@ class NgramMWLPhonemizer(MirandesePhonemizer):
         # 3. Clean up any remaining artifacts from the back-off or alignment
         return ipa_sequence.replace('̃', '').replace('ː', '')  # Example cleanup
 
+    # -----------------------------------------------
+    # 5. Vectorized batch prediction
+    # -----------------------------------------------
+
+    def _numpy_tables(self):
+        """
+        Per order (sorted packed keys, phoneme index) arrays plus the phoneme vocabulary, built once.
+        Tables of a loaded model are wrapped without a copy, their phonemes are already sorted.
+        """
+        import numpy as np
+
+        if self._np_tables is None or self._np_tables[0] is not self.tables:
+            if all(isinstance(table, _MappedTable) for table in self.tables):
+                vocab = self.tables[0].phonemes if self.tables else []
+                arrays = [(np.frombuffer(table.keys, dtype=np.int64) if len(table) else np.zeros(0, dtype=np.int64),
+                           np.frombuffer(table.phoneme_ids, dtype=np.uint32) if len(table)
+                           else np.zeros(0, dtype=np.uint32))
+                          for table in self.tables]
+            else:
+                vocab = sorted({entry[0] for table in self.tables for entry in table.values()})
+                index = {p: i for i, p in enumerate(vocab)}
+                arrays = []
+                for table in self.tables:
+                    keys = sorted(table)
+                    arrays.append((np.array(keys, dtype=np.int64),
+                                   np.array([index[table[k][0]] for k in keys], dtype=np.int64)))
+            self._np_tables = (self.tables, arrays, vocab)
+        return self._np_tables[1], self._np_tables[2]
+
+    def phonemize_many(self, words: list[str], lookup_word=False) -> list[str]:
+        """
+        Phonemizes many words at once, output is identical to calling phonemize() per word.
+
+        All graphemes are encoded into one integer array, every word prefixed by n-1 <S> ids,
+        a sliding window view gives the n-gram of every grapheme and the packed keys of all
+        orders are computed with a rolling sum. Each order's table is then probed for all
+        graphemes at once with searchsorted, longest context first. Falls back to phonemize()
+        per word without numpy or when the keys could overflow 64 bits.
+        """
+        if self.tables is None:
+            self.finalize()
+        base = len(self.grapheme_ids)
+        try:
+            import numpy as np
+            from numpy.lib.stride_tricks import sliding_window_view
+        except ImportError:
+            return [self._phonemize_word(word, lookup_word) for word in words]
+        if base ** self.n >= 2 ** 63:
+            return [self._phonemize_word(word, lookup_word) for word in words]
+
+        words = [word.lower() for word in words]
+        graphemes = [self._graphemes(word) for word in words]
+        flat_graphemes = [g for word_graphemes in graphemes for g in word_graphemes]
+        if not flat_graphemes:
+            return [self._phonemize_word(word, lookup_word) for word in words]
+        pad = [0] * (self.n - 1)
+        flat_ids = []
+        ends = []  # index of every real grapheme in flat_ids
+        for word_graphemes in graphemes:
+            flat_ids += pad
+            start = len(flat_ids)
+            flat_ids += [self.grapheme_ids.get(g, -1) for g in word_graphemes]
+            ends += range(start, len(flat_ids))
+        # the n-gram ending at every grapheme, its context being the n-1 ids before it
+        windows = sliding_window_view(np.array(flat_ids, dtype=np.int64), self.n)
+        windows = windows[np.array(ends, dtype=np.int64) - (self.n - 1)]
+
+        # order k key = id[n-k] * base^(k-1) + order k-1 key, valid while no id is unknown (-1)
+        order_keys = []
+        key = np.zeros(len(windows), dtype=np.int64)
+        valid = np.ones(len(windows), dtype=bool)
+        for k in range(1, self.n + 1):
+            column = windows[:, self.n - k]
+            valid = valid & (column >= 0)
+            key = column * base ** (k - 1) + key
+            order_keys.append((key, valid))
+
+        # Back-off: longest context first, every grapheme probes each order at most once
+        arrays, vocab = self._numpy_tables()
+        result = np.full(len(windows), -1, dtype=np.int64)
+        for k in range(self.n, 0, -1):
+            table_keys, table_phonemes = arrays[k - 1]
+            key, valid = order_keys[k - 1]
+            todo = np.flatnonzero(valid & (result < 0))
+            if not len(todo) or not len(table_keys):
+                continue
+            idx = np.searchsorted(table_keys, key[todo])
+            idx[idx == len(table_keys)] = 0
+            found = table_keys[idx] == key[todo]
+            result[todo[found]] = table_phonemes[idx[found]]
+
+        # unknown grapheme: Grapheme = Phoneme
+        predicted = [vocab[r] if r >= 0 else g for r, g in zip(result.tolist(), flat_graphemes)]
+        outputs = []
+        offset = 0
+        for word, word_graphemes in zip(words, graphemes):
+            end = offset + len(word_graphemes)
+            # Special case handling (can be kept if data is sparse)
+            outputs.append("l̩" if word == "l" else self._finish(predicted[offset:end]))
+            offset = end
+        return outputs
+
+    def _phonemize_unique_words(self, words: list[str], lookup_word: bool = True) -> dict[str, str]:
+        # numpy only pays off from a few dozen words, see benchmarks/ngram_batch.py
+        if len(words) < self.VECTORIZE_MIN_BATCH:
+            return {word: self._phonemize_word(word, lookup_word) for word in words}
+        return dict(zip(words, self.phonemize_many(words, lookup_word)))
+
 
 
 
@@ -104,10 +104,116 @@ class OrthographyRulesMWL(MirandesePhonemizer):
         self.keep_optional_phones = keep_optional_phones
         self.keep_stress_marks = keep_stress_marks
         # Mapping to convert graphemes to phonemes
-        self._vowels = "aeiouáéíóúäɐɛɨɪɔʊ"  # Extended set of vowels for context checking
-        self._voiced_consonants = "bdgjlmnrvz"  # Approximated list of voiced consonants
-        with open(os.path.join(os.path.dirname(__file__), "g2p.json")) as f:
+        self.g2p_path = os.path.join(os.path.dirname(__file__), "g2p.json")
+        self.rules_path = os.path.join(os.path.dirname(__file__), "orthography_rules.json")
+        with open(self.g2p_path) as f:
             self.MWL_ALPHABET_MAP = json.load(f)
+        self._grapheme_trie = self._build_trie(self.MWL_ALPHABET_MAP)
+        # Context rules, compiled for this dialect into a grapheme -> rule dispatch table
+        with open(self.rules_path) as f:
+            rules = json.load(f)
+        self._vowels = rules["classes"]["vowel"]  # Extended set of vowels for context checking
+        self._voiced_consonants = rules["classes"]["voiced_consonant"]  # Approximated list of voiced consonants
+        self._char_classes, self._rule_table = self._compile_rules(rules)
+
+    def engine_config(self) -> dict:
+        return {**super().engine_config(),
+                "keep_optional_phones": self.keep_optional_phones,
+                "keep_stress_marks": self.keep_stress_marks}
+
+    def _model_files(self) -> list[str]:
+        return [self.g2p_path, self.rules_path]
+
+    @staticmethod
+    def _build_trie(graphemes) -> dict:
+        """Character trie of all graphemes, the None key of a node holds the grapheme ending there."""
+        trie = {}
+        for grapheme in graphemes:
+            node = trie
+            for char in grapheme:
+                node = node.setdefault(char, {})
+            node[None] = grapheme
+        return trie
+
+    def _longest_grapheme(self, word: str, i: int) -> str | None:
+        """Longest grapheme of the map that word[i:] starts with, None if no grapheme matches."""
+        node = self._grapheme_trie
+        longest = None
+        for char in word[i:]:
+            node = node.get(char)
+            if node is None:
+                break
+            longest = node.get(None, longest)
+        return longest
+
+    def _compile_rules(self, rules: dict) -> tuple[dict, dict]:
+        """
+        Compiles the declarative context rules into
+          - a char -> bitset of the character classes it belongs to
+          - a grapheme -> (cases, default phoneme) dispatch table for this dialect
+
+        Every case is a tuple (prev_mask, next_mask, next_not_mask, next_seq, initial, final, phoneme),
+        the first case whose conditions all hold gives the phoneme, cases for other dialects are dropped.
+        """
+        class_bits = {}
+        char_classes = {}
+        for bit, (name, chars) in enumerate(rules["classes"].items()):
+            class_bits[name] = 1 << bit
+            for char in chars:
+                char_classes[char] = char_classes.get(char, 0) | 1 << bit
+
+        def mask(case: dict, key: str) -> int:
+            if key not in case:
+                return 0
+            if case[key] not in class_bits:
+                raise ValueError(f"unknown character class {case[key]!r} in orthography rule {case}")
+            return class_bits[case[key]]
+
+        def phoneme(grapheme: str, index: int) -> str:
+            if grapheme not in self.MWL_ALPHABET_MAP or not 0 <= index < len(self.MWL_ALPHABET_MAP[grapheme]):
+                raise ValueError(f"orthography rule refers to missing phoneme {grapheme!r}[{index}]")
+            return self.MWL_ALPHABET_MAP[grapheme][index]
+
+        dialect = getattr(self.dialect, "value", self.dialect)
+        known_keys = {"prev", "next", "next_not", "next_seq", "position", "dialects", "grapheme", "index"}
+        table = {}
+        for grapheme, rule in rules["rules"].items():
+            cases = []
+            for case in rule["cases"]:
+                if set(case) - known_keys:
+                    raise ValueError(f"unknown orthography rule keys {set(case) - known_keys} in {case}")
+                if case.get("position") not in (None, "initial", "final"):
+                    raise ValueError(f"position must be 'initial' or 'final' in orthography rule {case}")
+                if "dialects" in case and dialect not in case["dialects"]:
+                    continue
+                cases.append((mask(case, "prev"), mask(case, "next"), mask(case, "next_not"),
+                              case.get("next_seq", ""),
+                              case.get("position") == "initial", case.get("position") == "final",
+                              phoneme(case.get("grapheme", grapheme), case["index"])))
+            table[grapheme] = (tuple(cases), phoneme(grapheme, rule.get("default", 0)))
+        return char_classes, table
+
+    def _apply_rule(self, rule: tuple, word: str, start: int, end: int) -> str:
+        """Phoneme of the grapheme word[start:end] given its context."""
+        cases, default = rule
+        has_next = end < len(word)
+        prev_bits = self._char_classes.get(word[start - 1], 0) if start > 0 else 0
+        next_bits = self._char_classes.get(word[end], 0) if has_next else 0
+        for prev_mask, next_mask, next_not_mask, next_seq, initial, final, pho in cases:
+            if prev_mask and not prev_bits & prev_mask:
+                continue
+            if next_mask and not next_bits & next_mask:
+                continue
+            if next_not_mask and (not has_next or next_bits & next_not_mask):
+                continue
+            if next_seq and not word.startswith(next_seq, end):
+                continue
+            if initial and start != 0:
+                continue
+            if final and has_next:
+                continue
+            return pho
+        return default
 
     def _is_vowel(self, char):
         """Checks if a character is a vowel."""
@@ -152,199 +258,21 @@ class OrthographyRulesMWL(MirandesePhonemizer):
         while i < len(word):
             matched = False
 
-            # Try to match multi-character graphemes first (longest first)
+            # Longest grapheme starting at i, found in a single walk down the grapheme trie.
             # This ensures 'ch' is matched before 'c', 'lh' before 'l', etc.
             # Also handles new clusters like 'pl', 'kl', 'fl', 'mn', 'ly', 'cl', 'll', 'nn'
-            for length in sorted([len(g) for g in self.MWL_ALPHABET_MAP.keys()], reverse=True):
-                if i + length <= len(word):
-                    grapheme = word[i:i + length].lower()
-
-                    # Handle dialectal variations for 'l' and 'lh'
-                    if self.dialect == Dialects.SENDINESE:
-                        if grapheme == "lh":
-                            phonemes.append(self.MWL_ALPHABET_MAP["l"][0])  # 'lh' becomes [l] in Sendinese
-                            i += length
-                            matched = True
-                            break
-                        elif grapheme == "l" and i == 0:  # Initial 'l' in Sendinese remains [l]
-                            phonemes.append(self.MWL_ALPHABET_MAP["l"][0])
-                            i += length
-                            matched = True
-                            break
-
-                    if grapheme in self.MWL_ALPHABET_MAP:
-                        # Apply specific rules for graphemes based on context
-                        if grapheme == "b":
-                            # Rule: b = [β] between vowels and after voiced consonants
-                            if (i > 0 and self._is_vowel(word[i - 1])) and \
-                                    (i + 1 < len(word) and self._is_vowel(word[i + 1])):
-                                phonemes.append(self.MWL_ALPHABET_MAP["b"][1])  # [β] between vowels
-                            elif i > 0 and self._is_voiced_consonant(word[i - 1]):
-                                phonemes.append(self.MWL_ALPHABET_MAP["b"][1])  # [β] after voiced consonants
-                            else:
-                                phonemes.append(self.MWL_ALPHABET_MAP["b"][0])  # [b] otherwise
-                        elif grapheme == "c":
-                            # Rule: c = [s̻] before e or i, [k] elsewhere
-                            if (i + 1 < len(word) and word[i + 1].lower() in "ei"):
-                                phonemes.append(self.MWL_ALPHABET_MAP["c"][1])  # [s̻] before e or i (second element in map)
-                            else:
-                                phonemes.append(self.MWL_ALPHABET_MAP["c"][0])  # [k] elsewhere (first element in map)
-                        elif grapheme == "ç":
-                            # Rule: ç = [z̻] before words starting with voiced consonants
-                            # This rule is tricky without full word context (e.g., "words starting with voiced consonants")
-                            # For now, a simplified interpretation: if followed by a voiced consonant within the word.
-                            # A more accurate implementation would require sentence-level context.
-                            if i + 1 < len(word) and self._is_voiced_consonant(word[i + 1]):
-                                phonemes.append(self.MWL_ALPHABET_MAP["ç"][0])  # [z̻]
-                            else:
-                                phonemes.append(self.MWL_ALPHABET_MAP["ç"][0])  # Default to [z̻]
-                        elif grapheme == "d":
-                            # Rule: d = [ð] between vowels and after r
-                            if (i > 0 and self._is_vowel(word[i - 1])) and \
-                                    (i + 1 < len(word) and self._is_vowel(word[i + 1])):
-                                phonemes.append(self.MWL_ALPHABET_MAP["d"][1])  # [ð] between vowels
-                            elif i > 0 and word[i - 1].lower() == 'r':
-                                phonemes.append(self.MWL_ALPHABET_MAP["d"][1])  # [ð] after r
-                            else:
-                                phonemes.append(self.MWL_ALPHABET_MAP["d"][0])  # [d] otherwise
-                        elif grapheme == "e":
-                            # Rule: e = [ɨ/ɨ̃] before stressed syllables
-                            # This rule requires stress prediction, which is beyond this rule-based phonemizer.
-                            # Defaulting to the first phoneme [e].
-                            phonemes.append(self.MWL_ALPHABET_MAP["e"][0])
-                        elif grapheme == "g":
-                            # Rule: g = [ɣ] between vowels and after r. Before e and i, g = [ʒ].
-                            # g = [ɡu] in certain words, such as guira, guiron and guirica. g = [gu̯] before a
-                            if (i > 0 and self._is_vowel(word[i - 1])) and \
-                                    (i + 1 < len(word) and self._is_vowel(word[i + 1])):
-                                phonemes.append(self.MWL_ALPHABET_MAP["g"][1])  # [ɣ] between vowels
-                            elif i > 0 and word[i - 1].lower() == 'r':
-                                phonemes.append(self.MWL_ALPHABET_MAP["g"][1])  # [ɣ] after r
-                            elif (i + 1 < len(word) and word[i + 1].lower() in "ei"):
-                                phonemes.append(self.MWL_ALPHABET_MAP["g"][2])  # [ʒ] before e and i
-                            # The [ɡu] and [gu̯] rules are word-specific and complex for a simple rule-based system.
-                            # Defaulting to [g] for other cases.
-                            else:
-                                phonemes.append(self.MWL_ALPHABET_MAP["g"][0])
-                        elif grapheme == "gu":
-                            # Rule: gu = [ɣ] between vowels and after r
-                            # Simplified: checking context around 'gu'
-                            if (i > 0 and self._is_vowel(word[i - 1])) and \
-                                    (i + 2 < len(word) and self._is_vowel(
-                                        word[i + 2])):  # Check the character *after* 'u'
-                                phonemes.append(self.MWL_ALPHABET_MAP["gu"][2])  # [ɣ] between vowels (third element in map)
-                            elif i > 0 and word[i - 1].lower() == 'r':
-                                phonemes.append(self.MWL_ALPHABET_MAP["gu"][2])  # [ɣ] after r
-                            else:
-                                phonemes.append(self.MWL_ALPHABET_MAP["gu"][0])  # [g] otherwise (first element in map)
-                        elif grapheme == "i":
-                            # Rule: i can become glide [j] when preceding or following other vowels.
-                            is_glide = False
-                            # Check if 'i' is followed by a vowel
-                            if i + 1 < len(word) and self._is_vowel(word[i + 1]):
-                                is_glide = True
-                            # Check if 'i' is preceded by a vowel
-                            elif i > 0 and self._is_vowel(word[i - 1]):
-                                is_glide = True
-
-                            if is_glide:
-                                phonemes.append(self.MWL_ALPHABET_MAP["i"][1])  # [j]
-                            else:
-                                phonemes.append(self.MWL_ALPHABET_MAP["i"][0])  # [i]
-                        elif grapheme == "l":
-                            # This rule is now handled by the dialect-specific check above for 'sendinese'
-                            if self.dialect != Dialects.SENDINESE and i == 0:
-                                phonemes.append(
-                                    self.MWL_ALPHABET_MAP["l"][1])  # [ʎ] at the beginning of words (non-Sendinese)
-                            else:
-                                phonemes.append(self.MWL_ALPHABET_MAP["l"][0])  # [l] elsewhere
-                        elif grapheme == "lh":
-                            # This rule is now handled by the dialect-specific check above for 'sendinese'
-                            if self.dialect != Dialects.SENDINESE:
-                                phonemes.append(self.MWL_ALPHABET_MAP["lh"][0])  # [ʎ] for 'lh' (non-Sendinese)
-                            # else: handled by the 'sendinese' block above
-                        elif grapheme == "m":
-                            # Rule: m is silent before nasalized front vowels, e.g. amportante
-                            # Default to [m]. Nasalization of preceding vowels is handled by AN, EN, IN, ON, UN.
-                            phonemes.append(self.MWL_ALPHABET_MAP["m"][0])  # [m]
-                        elif grapheme == "n":
-                            # Rule: n = [ŋ] before k, g, q (velar consonants), otherwise [n].
-                            # Nasalization of preceding vowels is handled by AN, EN, IN, ON, UN.
-                            if i + 1 < len(word) and word[i + 1].lower() in "kgq":
-                                phonemes.append(self.MWL_ALPHABET_MAP["n"][1])  # [ŋ]
-                            else:
-                                phonemes.append(self.MWL_ALPHABET_MAP["n"][0])  # [n]
-                        elif grapheme == "o":
-                            # Rule: o = [u] when unstressed. Also, final -o becomes /u/.
-                            if i == len(word) - 1:  # If 'o' is the last character in the word
-                                phonemes.append(self.MWL_ALPHABET_MAP["o"][2])  # [u] (third element in map)
-                            # This rule requires stress prediction, which is beyond this rule-based phonemizer.
-                            # Defaulting to the first phoneme [ɔ] for non-final 'o'.
-                            else:
-                                phonemes.append(self.MWL_ALPHABET_MAP["o"][0])
-                        elif grapheme == "qu":
-                            # Rule: qu = [k] before e and i, and [kṷ] before a and en
-                            if (i + 2 < len(word) and word[i + 2].lower() in "ei"):
-                                phonemes.append(self.MWL_ALPHABET_MAP["qu"][0])  # [k] before e and i
-                            elif (i + 2 < len(word) and word[i + 2].lower() == "a") or \
-                                    (i + 2 < len(word) - 1 and word[i + 2:i + 4].lower() == "en"):
-                                phonemes.append(self.MWL_ALPHABET_MAP["qu"][1])  # [kṷ] before a or en
-                            else:
-                                phonemes.append(self.MWL_ALPHABET_MAP["qu"][0])  # default to [k]
-                        elif grapheme == "r":
-                            # Rule: r = [rr] at the beginning of words and after n
-                            # The "hard" or "long" R is an alveolar trill /r/. The "soft" or "short" R is an alveolar tap [ɾ].
-                            # The map has ["ɾ", "r", "rr"]. So "r" is the trill, "ɾ" is the tap.
-                            if i == 0 or (i > 0 and word[i - 1].lower() == 'n'):  # At beginning or after n
-                                phonemes.append(self.MWL_ALPHABET_MAP["r"][1])  # [r] (second element in map, the trill)
-                            else:
-                                phonemes.append(
-                                    self.MWL_ALPHABET_MAP["r"][0])  # [ɾ] elsewhere (first element in map, the tap)
-                        elif grapheme == "s":
-                            # Rule: s = [s̺] when in initial position and before silent consonants.
-                            # Between vowels and before voiced consonants, s = [z̺]
-                            if i == 0 or (i + 1 < len(word) and not self._is_vowel(
-                                    word[i + 1])):  # Initial or before non-vowel (simplified 'silent consonant')
-                                phonemes.append(self.MWL_ALPHABET_MAP["s"][0])  # [s̺]
-                            elif (i > 0 and self._is_vowel(word[i - 1])) and \
-                                    (i + 1 < len(word) and self._is_voiced_consonant(word[i + 1])):
-                                phonemes.append(
-                                    self.MWL_ALPHABET_MAP["s"][1])  # [z̺] between vowels and before voiced consonants
-                            elif (i > 0 and self._is_vowel(word[i - 1])) and \
-                                    (i + 1 < len(word) and self._is_vowel(word[i + 1])):
-                                phonemes.append(self.MWL_ALPHABET_MAP["s"][1])  # [z̺] between vowels
-                            else:
-                                phonemes.append(self.MWL_ALPHABET_MAP["s"][0])  # Default [s̺]
-                        elif grapheme == "u":
-                            # Rule: u can become glide [w] when preceding or following other vowels.
-                            is_glide = False
-                            # Check if 'u' is followed by a vowel
-                            if i + 1 < len(word) and self._is_vowel(word[i + 1]):
-                                is_glide = True
-                            # Check if 'u' is preceded by a vowel
-                            elif i > 0 and self._is_vowel(word[i - 1]):
-                                is_glide = True
-
-                            if is_glide:
-                                phonemes.append(self.MWL_ALPHABET_MAP["u"][1])  # [w]
-                            else:
-                                phonemes.append(self.MWL_ALPHABET_MAP["u"][0])  # [u]
-                        # For v and w, the map has multiple options, but Wikipedia implies primarily for loanwords.
-                        # Sticking to the first phoneme in the map as default for simplicity.
-                        elif grapheme == "v":
-                            phonemes.append(self.MWL_ALPHABET_MAP["v"][0])
-                        elif grapheme == "w":
-                            phonemes.append(self.MWL_ALPHABET_MAP["w"][0])
-                        # --- cluster rules ---
-                        elif grapheme in ["pl", "kl", "fl", "mn", "ly", "cl", "ll", "nn"]:
-                            phonemes.append(self.MWL_ALPHABET_MAP[grapheme][0])
-                        else:
-                            # For other graphemes, take the first phoneme in the list as default
-                            phonemes.append(self.MWL_ALPHABET_MAP[grapheme][0])
-
-                        i += length
-                        matched = True
-                        break  # Break from the inner loop (grapheme lengths) once a match is found
+            grapheme = self._longest_grapheme(word, i)
+            if grapheme is not None:
+                length = len(grapheme)
+                # context rules from orthography_rules.json, other graphemes take their first phoneme
+                rule = self._rule_table.get(grapheme)
+                if rule is None:
+                    phonemes.append(self.MWL_ALPHABET_MAP[grapheme][0])
+                else:
+                    phonemes.append(self._apply_rule(rule, word, i, i + length))
+
+                i += length
+                matched = True
 
             # If no multi-character grapheme matched, try single character
             if not matched:
@@ -358,22 +286,13 @@ class OrthographyRulesMWL(MirandesePhonemizer):
         phonemized = "".join(phonemes)
         return self._post_process(phonemized)
 
-    def phonemize_sentence(self,  text: str):
-        text = text.replace("-", " ")
-        words = re.findall(r"\b\w+\b|[\W_]+", text)  # Split by words and keep punctuation/spaces
-        phonemized_parts = []
-        for word_or_punc in words:
-            if word_or_punc.isalpha():
-                phonemized_parts.append(
-                    self.phonemize_word(word_or_punc))
-            else:
-                phonemized_parts.append(word_or_punc)  # Keep punctuation and spaces as is
-        return "".join(phonemized_parts)
+    def phonemize_sentence(self,  text: str, lookup_word: bool = False):
+        return self.phonemize_batch([text], lookup_word=lookup_word)[0]
 
     # -------------------------
     # Phonemizer interface
     # -------------------------
-    def phonemize(self, word: str, lookup_word: bool = True) -> str:
+    def _phonemize_word(self, word: str, lookup_word: bool = True) -> str:
         """Phonemize a single Mirandese word via espeak + correction rules."""
         if lookup_word and word.lower() in self.GOLD:
             return self.GOLD[word.lower()]
@@ -0,0 +1,122 @@
+"""
+phonemize large corpora on every core
+
+    from mwl_phonemizer.parallel import phonemize_corpus
+
+    for phonemes in phonemize_corpus(open("corpus.txt"), engine="CRFOrthoCorrector", jobs=32):
+        ...
+"""
+import importlib
+import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator
+
+from mwl_phonemizer.base import MirandesePhonemizer
+
+# the engine of this worker process, created once by _init_worker
+_ENGINE: MirandesePhonemizer | None = None
+
+
+def _resolve_engine(engine: str | type) -> type:
+    if isinstance(engine, str):
+        return getattr(importlib.import_module("mwl_phonemizer"), engine)
+    return engine
+
+
+def _chunked(texts: Iterable[str], chunksize: int) -> Iterator[list[str]]:
+    chunk = []
+    for text in texts:
+        chunk.append(text)
+        if len(chunk) >= chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _init_worker(engine_cls: type, engine_kwargs: dict):
+    global _ENGINE
+    _ENGINE = engine_cls(**engine_kwargs)
+
+
+def _phonemize_chunk(texts: list[str], lookup_word: bool) -> list[str]:
+    return _ENGINE.phonemize_batch(texts, lookup_word)
+
+
+def phonemize_corpus(texts: Iterable[str],
+                     engine: str | type = "CRFOrthoCorrector",
+                     engine_kwargs: dict | None = None,
+                     jobs: int | None = None,
+                     chunksize: int = 256,
+                     lookup_word: bool = True,
+                     max_pending: int | None = None,
+                     mp_context=None) -> Iterator[str]:
+    """
+    Phonemizes texts on a pool of worker processes, yielding one output per input text in input order.
+
+    Every worker builds its own engine once, CRF models are trained (or loaded from the
+    model registry) in the parent first and then loaded from that file by the workers.
+    At most `max_pending` chunks (2 per worker by default) are in flight, so memory stays
+    bounded however large `texts` is. `engine_kwargs` must be picklable, pass `disk_cache`
+    as a path rather than a DiskWordCache.
+    """
+    from mwl_phonemizer.crf_mwl import CRFPhonemizer
+
+    engine_cls = _resolve_engine(engine)
+    engine_kwargs = dict(engine_kwargs or {})
+    jobs = jobs or os.cpu_count() or 1
+    chunks = _chunked(texts, chunksize)
+
+    phonemizer = None
+    tmp_dir = None
+    if jobs == 1 or issubclass(engine_cls, CRFPhonemizer):
+        phonemizer = engine_cls(**engine_kwargs)
+    if isinstance(phonemizer, CRFPhonemizer):
+        if phonemizer.model_path is None:  # trained in memory only, hand it to the workers through a temp file
+            tmp_dir = tempfile.mkdtemp(prefix="mwl_phonemizer_")
+            phonemizer.save_model(os.path.join(tmp_dir, f"{engine_cls.__name__}.crfsuite"))
+        engine_kwargs["crf_model_path"] = phonemizer.model_path
+
+    try:
+        if jobs == 1:
+            for chunk in chunks:
+                yield from phonemizer.phonemize_batch(chunk, lookup_word)
+            return
+
+        del phonemizer
+        max_pending = max_pending or 2 * jobs
+        pool = ProcessPoolExecutor(jobs, mp_context=mp_context,
+                                   initializer=_init_worker, initargs=(engine_cls, engine_kwargs))
+        try:
+            pending = deque()
+            for chunk in chunks:
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+                pending.append(pool.submit(_phonemize_chunk, chunk, lookup_word))
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            # also reached when the caller stops iterating early
+            pool.shutdown(wait=True, cancel_futures=True)
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import time
+
+    corpus = [
+        "Muitas lhénguas ténen proua de ls sous pergaminos antigos, de la lhiteratura screbida hai cientos d'anhos i de scritores hai muito afamados, hoije bandeiras dessas lhénguas.",
+        "Todos ls seres houmanos nácen lhibres i eiguales an honra i an dreitos.",
+        "Hai más fuogo alhá, i ye deimingo!",
+    ] * 2000
+
+    for jobs in sorted({1, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        out = list(phonemize_corpus(corpus, engine="CRFOrthoCorrector", jobs=jobs,
+                                    engine_kwargs={"cache_size": 0}))
+        print(f"jobs={jobs}: {len(out) / (time.perf_counter() - start):.0f} sentences/sec")
@@ -0,0 +1,232 @@
+"""ordered IPA correction rules, compiled once and shared by the espeak and epitran engines"""
+import re
+import time
+from collections import Counter
+from typing import Callable
+
+
+class Rule:
+    """
+    A single correction, applied to the IPA of a word.
+
+    A literal rule is a str.replace of `pattern` by `repl`, a regex rule (regex=True) is
+    a re.sub. `requires` is a substring every match of a regex rule contains, the rule is
+    skipped for words without it. `when` is a predicate on the orthography of the word,
+    the rule only applies to words it accepts.
+    """
+
+    def __init__(self, pattern: str, repl: str, regex: bool = False, requires: str | None = None,
+                 when: Callable[[str], bool] | None = None, name: str | None = None):
+        if not pattern:
+            raise ValueError("rule pattern must not be empty")
+        self.pattern = pattern
+        self.repl = repl
+        self.regex = regex
+        self.requires = requires
+        self.when = when
+        self.name = name or f"{pattern} -> {repl}"
+
+    def __repr__(self):
+        return f"Rule({self.name!r})"
+
+
+def _can_overlap(a: str, b: str) -> bool:
+    """True if some placement of b overlapping a agrees with a on every shared character"""
+    for shift in range(-len(b) + 1, len(a)):
+        start, end = max(0, shift), min(len(a), shift + len(b))
+        if a[start:end] == b[start - shift:end - shift]:
+            return True
+    return False
+
+
+class RulePipeline:
+    """
+    Applies an ordered list of Rules to IPA strings.
+
+    Regexes are compiled once. Runs of adjacent literal rules that commute, i.e. no pattern
+    overlaps another and no replacement can create a later pattern, are fused into a
+    single str.translate or regex alternation pass, which gives the same output as replacing
+    them one after another. Fused and regex steps are skipped for words where they can not match.
+
+    With stats=True the pipeline counts, per rule, the words it changed and, per step,
+    the time spent in it (see report()).
+    """
+
+    def __init__(self, rules: list[Rule], exceptions: dict[str, str] | None = None, stats: bool = False):
+        self.rules = list(rules)
+        self.exceptions = dict(exceptions or {})
+        self.stats = stats
+        self._steps = self._compile(self.rules)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.words = 0
+        self.hits: Counter[str] = Counter()
+        self.seconds: Counter[str] = Counter()
+
+    # -------------------------
+    # Compilation
+    # -------------------------
+    @staticmethod
+    def _fusable(group: list[Rule], rule: Rule) -> bool:
+        if rule.regex or group[0].when is not rule.when:
+            return False
+        return all(other.repl and not _can_overlap(other.repl, rule.pattern)
+                   and not _can_overlap(other.pattern, rule.pattern)
+                   for other in group)
+
+    @classmethod
+    def _compile(cls, rules: list[Rule]) -> list[tuple]:
+        """Returns the steps as (name, rules, guard, when, function) tuples"""
+        groups: list[list[Rule]] = []
+        for rule in rules:
+            if groups and not groups[-1][0].regex and cls._fusable(groups[-1], rule):
+                groups[-1].append(rule)
+            else:
+                groups.append([rule])
+
+        steps = []
+        for group in groups:
+            rule = group[0]
+            if rule.regex:
+                guard = (rule.requires,) if rule.requires else ()
+                function = lambda out, sub=re.compile(rule.pattern).sub, repl=rule.repl: sub(repl, out)
+            elif len(group) == 1:
+                guard = ()
+                function = lambda out, old=rule.pattern, new=rule.repl: out.replace(old, new)
+            else:
+                # any match contains the last character of one of the patterns
+                guard = tuple(dict.fromkeys(r.pattern[-1] for r in group))
+                tokens = {r.pattern: r.repl for r in group}
+                if all(len(old) == 1 for old in tokens):
+                    function = lambda out, table=str.maketrans(tokens): out.translate(table)
+                else:
+                    regex = re.compile("|".join(re.escape(old) for old in tokens))
+                    function = lambda out, sub=regex.sub, tokens=tokens: sub(lambda m: tokens[m.group()], out)
+            name = " | ".join(r.name for r in group)
+            steps.append((name, tuple(group), guard, rule.when, function))
+        return steps
+
+    # -------------------------
+    # Application
+    # -------------------------
+    def apply(self, ipa: str, ortho: str) -> str:
+        """Corrects the IPA of the word with orthography `ortho`"""
+        if ortho in self.exceptions:
+            return self.exceptions[ortho]
+        if self.stats:
+            return self._apply_with_stats(ipa, ortho)
+        out = ipa
+        for _, _, guard, when, function in self._steps:
+            for required in guard:
+                if required in out:
+                    break
+            else:
+                if guard:
+                    continue
+            if when is not None and not when(ortho):
+                continue
+            out = function(out)
+        return out
+
+    def _apply_with_stats(self, ipa: str, ortho: str) -> str:
+        self.words += 1
+        out = ipa
+        for name, rules, guard, when, function in self._steps:
+            start = time.perf_counter()
+            if (not guard or any(g in out for g in guard)) and (when is None or when(ortho)):
+                before = out
+                out = function(out)
+                if out != before:
+                    if len(rules) == 1:
+                        self.hits[rules[0].name] += 1
+                    else:
+                        self.hits.update(r.name for r in rules if r.pattern in before)
+            self.seconds[name] += time.perf_counter() - start
+        return out
+
+    def report(self) -> str:
+        """Per step hit counts and time per word, slowest first"""
+        if not self.words:
+            return "no words corrected with stats enabled"
+        lines = [f"{self.words} words, {sum(self.seconds.values()) / self.words * 1e6:.2f} us/word",
+                 f"{'us/word':>8} | {'hits':>7} | step"]
+        for name, seconds in self.seconds.most_common():
+            hits = sum(self.hits[r.name] for r in next(s[1] for s in self._steps if s[0] == name))
+            lines.append(f"{seconds / self.words * 1e6:>8.3f} | {hits:>7} | {name}")
+        return "\n".join(lines)
+
+
+_VOWELS = "aeiouɐɛɔuiɨ"
+_SOFT_C = re.compile(r"c[ei]")
+
+
+def _spelled_with_soft_c(ortho: str) -> bool:
+    return "ç" in ortho.lower() or bool(_SOFT_C.search(ortho.lower()))
+
+
+# corrections of Portuguese IPA (as given by espeak or epitran) towards Mirandese, in order
+PT_IPA_RULES = [
+    # Rhotics
+    Rule("ɹ", "ɾ"),
+    Rule("ʁ", "r"),
+
+    # Intervocalic lenition (optional, add exceptions if needed)
+    Rule(f'([{_VOWELS}])b([{_VOWELS}])', 'β', regex=True, requires="b"),
+    Rule(f'([{_VOWELS}])d([{_VOWELS}])', 'ð', regex=True, requires="d"),
+    Rule(f'([{_VOWELS}])g([{_VOWELS}])', 'ɣ', regex=True, requires="g"),
+
+    # Palatalization / Nasals
+    Rule("lh", "ʎ"),
+    Rule("nh", "ɲ"),
+
+    # Diphthongs and glides
+    Rule("aɪ", "aj"),
+    Rule("eɪ", "ej"),
+    Rule("oʊ", "ow"),
+    Rule("au", "aw"),
+
+    # Nasal vowels
+    Rule("iŋ", "ĩ"),
+    Rule("uŋ", "ũ"),
+    Rule("ãŋ", "ɐ̃"),
+    Rule("eɪŋ", "ej̃"),
+    Rule("aɪŋ", "aj̃"),
+    Rule("oʊŋ", "ow̃"),
+
+    # Sibilants
+    Rule(r'ʃ\Z', 's̺', regex=True, requires="ʃ"),
+    Rule(f'^s(?=[^{_VOWELS}])', 's̺', regex=True, requires="s"),
+    Rule(r's(?=[eiɨ])', 's̻', regex=True, requires="s"),
+
+    # Latin clusters / consonant corrections
+    Rule(r'^(pl|kl|fl)', 'tʃ', regex=True, requires="l"),
+    Rule(f'^l(?=[{_VOWELS}])', 'ʎ', regex=True, requires="l"),
+
+    # Final vowel shifts
+    Rule(r'o$', 'u', regex=True, requires="o"),
+
+    # Orthography-specific retroflex sibilants
+    Rule("s̺", "s̻", when=_spelled_with_soft_c),
+    Rule("z̺", "z̻", when=_spelled_with_soft_c),
+
+    # Stress normalization: place before main vowel
+    Rule(f'ˈ([^{_VOWELS}]*)([{_VOWELS}])', r'ˈ\2', regex=True, requires="ˈ"),
+
+    # Misc fixes based on experimental output comparison
+    Rule("ɨɾə", "ɨɾ"),
+    Rule("bˈiɾ", "ˈβiɾ"),
+    Rule("ʃk", "s̺k"),
+    Rule(r'^bˌe', 'bɨ', regex=True, requires="bˌe", when=lambda ortho: ortho.startswith("be")),
+    # the "b" of "mb" is kept after "ɐ̃b"
+    Rule(r'^ɐ̃m(?=b)', 'ɐ̃b', regex=True, requires="ɐ̃m", when=lambda ortho: ortho.startswith("amb")),
+    Rule(r'(?<=u)s\Z', 's̻', regex=True, requires="us", when=lambda ortho: ortho.endswith("uç")),
+    Rule(r'oŋ\Z', 'õ', regex=True, requires="oŋ"),
+    # only the final "ɾədʊ" is kept before "ɾdu"
+    Rule(r'(?s).*(ɾədʊ)\Z', r'\1ɾdu', regex=True, requires="ɾədʊ"),
+]
+
+# handle common standalone words, like determinants
+PT_IPA_EXCEPTIONS = {"l": "l̩", "ls": "l̩s̺"}
+
+PT_IPA_CORRECTIONS = RulePipeline(PT_IPA_RULES, PT_IPA_EXCEPTIONS)
@@ -0,0 +1,118 @@
+"""
+phonemize arbitrarily large texts in constant memory
+
+    from mwl_phonemizer import CRFOrthoCorrector
+    from mwl_phonemizer.streaming import phonemize_file
+
+    for sentence, phonemes in phonemize_file("corpus.txt", CRFOrthoCorrector()):
+        ...
+"""
+import re
+from typing import IO, Iterable, Iterator
+
+from mwl_phonemizer.base import MirandesePhonemizer
+
+# a sentence ends at . ! ? or … (optionally followed by closing quotes/brackets) and whitespace
+_SENTENCE_END = re.compile(r"(?<=[.!?…])[\"'»”)\]]*\s+")
+_WHITESPACE = re.compile(r"\s+")
+
+READ_SIZE = 1 << 16
+
+
+def read_chunks(f: IO[str], size: int = READ_SIZE) -> Iterator[str]:
+    """Reads a text file in fixed size chunks, a file without newlines never ends up in memory as one line."""
+    while True:
+        chunk = f.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_sentences(chunks: Iterable[str], max_sentence_chars: int = 10000) -> Iterator[str]:
+    """
+    Splits a stream of text chunks into sentences, sentences spanning chunk edges are kept whole.
+    Whitespace inside a sentence is collapsed to single spaces. Text without any sentence
+    punctuation is cut at the last space before max_sentence_chars to keep memory bounded.
+    """
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        start = 0
+        # the separator must be followed by more text, else the sentence may still continue in the next chunk
+        for match in _SENTENCE_END.finditer(buffer):
+            if match.end() == len(buffer):
+                break
+            sentence = _WHITESPACE.sub(" ", buffer[start:match.end()]).strip()
+            if sentence:
+                yield sentence
+            start = match.end()
+        buffer = buffer[start:]
+        while len(buffer) > max_sentence_chars:
+            cut = buffer.rfind(" ", 0, max_sentence_chars)
+            if cut <= 0:
+                cut = max_sentence_chars
+            sentence = _WHITESPACE.sub(" ", buffer[:cut]).strip()
+            if sentence:
+                yield sentence
+            buffer = buffer[cut:]
+    sentence = _WHITESPACE.sub(" ", buffer).strip()
+    if sentence:
+        yield sentence
+
+
+def phonemize_stream(texts: Iterable[str], phonemizer: MirandesePhonemizer,
+                     batch_size: int = 256, lookup_word: bool = True) -> Iterator[tuple[str, str]]:
+    """
+    Lazily yields (text, phonemes) for every text, texts are phonemized in batches of batch_size
+    so repeated words are deduplicated and served from the phonemizer word cache.
+    """
+    batch = []
+    for text in texts:
+        batch.append(text)
+        if len(batch) >= batch_size:
+            yield from zip(batch, phonemizer.phonemize_batch(batch, lookup_word))
+            batch = []
+    if batch:
+        yield from zip(batch, phonemizer.phonemize_batch(batch, lookup_word))
+
+
+def phonemize_file(path: str, phonemizer: MirandesePhonemizer,
+                   mode: str = "sentence", batch_size: int = 256, lookup_word: bool = True,
+                   encoding: str = "utf-8") -> Iterator[tuple[str, str]]:
+    """
+    Lazily yields (text, phonemes) records for a text file.
+
+    mode="sentence" splits the file into sentences regardless of line breaks,
+    mode="line" yields one record per line (empty lines included) so outputs line up with the input.
+    """
+    if mode not in ("sentence", "line"):
+        raise ValueError(f"mode must be 'sentence' or 'line', got {mode!r}")
+    with open(path, encoding=encoding) as f:
+        if mode == "sentence":
+            texts = iter_sentences(read_chunks(f))
+        else:
+            texts = (line.rstrip("\r\n") for line in f)
+        yield from phonemize_stream(texts, phonemizer, batch_size, lookup_word)
+
+
+if __name__ == "__main__":
+    import tempfile
+    import tracemalloc
+
+    from mwl_phonemizer.orthography_hand_rules import OrthographyRulesMWL
+
+    text = ("Muitas lhénguas ténen proua de ls sous pergaminos antigos, de la lhiteratura screbida hai cientos "
+            "d'anhos i de scritores hai muito afamados, hoije bandeiras dessas lhénguas. Mas outras hai que nun\n"
+            "puoden tener proua de nada desso, cumo ye l causo de la lhéngua mirandesa. Hai más fuogo alhá, i ye "
+            "deimingo!\n")
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", encoding="utf-8", delete=False) as f:
+        for _ in range(20000):
+            f.write(text)
+
+    tracemalloc.start()
+    n = 0
+    for sentence, phonemes in phonemize_file(f.name, OrthographyRulesMWL()):
+        n += 1
+    print(f"{n} sentences, peak memory {tracemalloc.get_traced_memory()[1] / 1e6:.1f} MB")
+    print(sentence)
+    print(phonemes)
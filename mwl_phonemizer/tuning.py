@@ -0,0 +1,219 @@
+"""
+k-fold cross-validated hyperparameter search for the CRF correctors, on a pool of worker processes
+
+    from mwl_phonemizer.tuning import tune
+
+    leaderboard, phonemizer = tune("CRFOrthoCorrector", {"c1": [0.01, 0.1, 0.5], "c2": [0.01, 0.1]},
+                                   search="grid", folds=5, jobs=8)
+
+Gold words are split in folds, every configuration is trained on all folds but one and scored
+(PER on the held-out words, lookup_word=False) on the one left out, in turn. Grapheme transforms,
+alignments and features of every training pair are computed once per alignment strategy and
+shared by all folds and configurations, workers only fit models.
+"""
+import importlib
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mwl_phonemizer.crf_mwl import AlignmentStrategy, CRFPhonemizer, fit_crfsuite
+from mwl_phonemizer.model_registry import ModelRegistry
+
+# CRFPhonemizer hyperparameters that can be searched, ignore_stress is fixed by every corrector
+TUNABLE = ("algorithm", "c1", "c2", "max_iterations", "all_possible_transitions", "strategy")
+
+DEFAULT_SPACE = {
+    "c1": [0.0, 0.01, 0.05, 0.1, 0.25, 0.5],
+    "c2": [0.001, 0.01, 0.05, 0.1, 0.25, 0.5],
+    "max_iterations": [50, 100, 200],
+    "all_possible_transitions": [False, True],
+    "strategy": [AlignmentStrategy.LEV.value, AlignmentStrategy.PAD.value],
+}
+
+# training sequences and fold of every gold word in this worker process, set once by _init_worker
+_SEQUENCES: dict[str, list[list[tuple[list[dict], list[str]]]]] = {}
+_FOLDS: list[int] = []
+
+
+def grid_configs(space: dict[str, list]) -> list[dict]:
+    """Every combination of the values in the search space"""
+    return [dict(zip(space, values)) for values in itertools.product(*space.values())]
+
+
+def random_configs(space: dict[str, list], trials: int, seed: int = 0) -> list[dict]:
+    """Up to `trials` distinct combinations, every value drawn uniformly from its list"""
+    rnd = random.Random(seed)
+    configs = {}
+    # at most trials * 10 draws, small spaces have fewer distinct combinations than trials
+    for _ in range(trials * 10):
+        config = {name: rnd.choice(values) for name, values in space.items()}
+        configs.setdefault(tuple(config.items()), config)
+        if len(configs) == trials:
+            break
+    return list(configs.values())
+
+
+def _fit_params(config: dict) -> dict:
+    """sklearn_crfsuite arguments of a configuration, c1 / c2 are only passed to the algorithms that take them"""
+    params = {k: v for k, v in config.items() if k != "strategy"}
+    algorithm = params.get("algorithm", "lbfgs")
+    if algorithm != "lbfgs":
+        params["c1"] = None
+    if algorithm not in ("lbfgs", "l2sgd"):
+        params["c2"] = None
+    return params
+
+
+def _init_worker(sequences: dict, folds: list[int]):
+    global _SEQUENCES, _FOLDS
+    import sklearn_crfsuite  # imported here, not in the first timed fit
+    _SEQUENCES, _FOLDS = sequences, folds
+
+
+def _fit_fold(config: dict, fold: int, seed: int) -> tuple[bytes, float]:
+    """Trains a configuration on every fold but `fold`, returns the native model and the training seconds"""
+    sequences = [seq for word_seqs, word_fold in zip(_SEQUENCES[config["strategy"]], _FOLDS)
+                 if word_fold != fold for seq in word_seqs]
+    random.Random(seed).shuffle(sequences)
+    start = time.perf_counter()
+    model = fit_crfsuite([x for x, _ in sequences], [y for _, y in sequences], **_fit_params(config))
+    return model, time.perf_counter() - start
+
+
+class _Scorer:
+    """PER of the held-out words of a fold, tagged the way CRFPhonemizer.phonemize does"""
+
+    def __init__(self, engine: CRFPhonemizer, words: list[str], tx_words: list[str]):
+        self.engine = engine
+        self.words = words
+        self.tx_words = tx_words
+
+    def errors(self, model: bytes, word_ids: list[int]) -> tuple[int, int, int, int]:
+        """(edit distance, gold length, stress-agnostic edit distance, stress-agnostic gold length)"""
+        import pycrfsuite
+        tagger = pycrfsuite.Tagger()
+        tagger.open_inmemory(model)
+        engine = self.engine
+        errors = length = errors_no_stress = length_no_stress = 0
+        for i in word_ids:
+            word = self.words[i]
+            phonemes = engine._postprocess(word, "".join(tagger.tag(engine.item_sequence(self.tx_words[i]))))
+            gold = engine.GOLD[word]
+            errors += engine.word_edit_distance(phonemes, gold)
+            length += len(gold)
+            errors_no_stress += engine.word_edit_distance(engine.strip_stress(phonemes), engine.strip_stress(gold))
+            length_no_stress += len(engine.strip_stress(gold))
+        return errors, length, errors_no_stress, length_no_stress
+
+
+def _resolve_engine(engine: str | type) -> type:
+    if isinstance(engine, str):
+        return getattr(importlib.import_module("mwl_phonemizer"), engine)
+    return engine
+
+
+def cross_validate(engine: str | type, configs: list[dict], folds: int = 5, jobs: int | None = None,
+                   seed: int = 0, registry: ModelRegistry | None = None) -> list[dict]:
+    """
+    Scores every configuration by k-fold cross-validation on the gold words of the engine,
+    best first. Held-out PER pools the errors of all folds, train time and model size are
+    per fold averages. jobs=None or 0 starts one worker process per core, 1 runs in this process.
+    """
+    if folds < 2:
+        raise ValueError("cross-validation needs at least 2 folds")
+    for config in configs:
+        unknown = set(config) - set(TUNABLE)
+        if unknown:
+            raise ValueError(f"not tunable: {', '.join(sorted(unknown))}, valid hyperparameters are {TUNABLE}")
+    engine_cls = _resolve_engine(engine)
+    registry = registry or ModelRegistry()
+    # default hyperparameters, the engine is only needed for its transforms and GOLD, no model is trained
+    pho = engine_cls(train=False)
+    defaults = pho.training_config()
+    configs = [{**{k: defaults[k] for k in TUNABLE}, **config} for config in configs]
+    for config in configs:  # plain values, for the leaderboard JSON and the workers
+        config["strategy"] = AlignmentStrategy(config["strategy"]).value
+
+    words = list(pho.GOLD)
+    tx_words = pho._transform_gold(words, registry)
+    pairs = [pho.gold_training_pairs(word, tx_word) for word, tx_word in zip(words, tx_words)]
+    sequences = {strategy: [[pho.training_sequence(str_input, gold, AlignmentStrategy(strategy))
+                             for str_input, gold in word_pairs] for word_pairs in pairs]
+                 for strategy in dict.fromkeys(config["strategy"] for config in configs)}
+    order = list(range(len(words)))
+    random.Random(seed).shuffle(order)
+    word_folds = [0] * len(words)
+    for n, i in enumerate(order):
+        word_folds[i] = n % folds
+    held_out = [[i for i in range(len(words)) if word_folds[i] == fold] for fold in range(folds)]
+
+    tasks = [(config, fold) for config in configs for fold in range(folds)]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        _init_worker(sequences, word_folds)
+        fitted = [_fit_fold(config, fold, seed) for config, fold in tasks]
+    else:
+        with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(sequences, word_folds)) as pool:
+            fitted = list(pool.map(_fit_fold, *zip(*tasks), [seed] * len(tasks)))
+
+    scorer = _Scorer(pho, words, tx_words)
+    leaderboard = []
+    for n, config in enumerate(configs):
+        fold_errors, seconds, sizes = [], [], []
+        for fold in range(folds):
+            model, train_seconds = fitted[n * folds + fold]
+            fold_errors.append(scorer.errors(model, held_out[fold]))
+            seconds.append(train_seconds)
+            sizes.append(len(model))
+        errors, length, errors_no_stress, length_no_stress = map(sum, zip(*fold_errors))
+        leaderboard.append({"config": config,
+                            "per": errors / length,
+                            "per_no_stress": errors_no_stress / length_no_stress,
+                            "fold_per": [e[0] / e[1] for e in fold_errors],
+                            "train_seconds": sum(seconds) / folds,
+                            "model_bytes": sum(sizes) // folds})
+    leaderboard.sort(key=lambda row: (row["per"], row["per_no_stress"], row["train_seconds"]))
+    return leaderboard
+
+
+def leaderboard_markdown(leaderboard: list[dict]) -> str:
+    names = list(leaderboard[0]["config"]) if leaderboard else list(TUNABLE)
+    header = ["#", *names, "PER", "PER no stress", "train (s)", "model (KB)"]
+    lines = ["| " + " | ".join(header) + " |", "|" + "|".join("---" for _ in header) + "|"]
+    for rank, row in enumerate(leaderboard, 1):
+        cells = [str(rank), *(str(row["config"][name]) for name in names), f"{row['per']:.2%}",
+                 f"{row['per_no_stress']:.2%}", f"{row['train_seconds']:.2f}", f"{row['model_bytes'] / 1024:.1f}"]
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines)
+
+
+def tune(engine: str | type = "CRFOrthoCorrector", space: dict[str, list] | None = None, search: str = "random",
+         trials: int = 20, folds: int = 5, jobs: int | None = None, seed: int = 0,
+         registry: ModelRegistry | None = None, output: str | None = None) -> tuple[list[dict], CRFPhonemizer]:
+    """
+    Cross-validates a grid or a random sample of the search space, then trains the best
+    configuration on all gold words into the model registry, so `engine(**best config)` loads
+    it instantly, and to `output` if given (load it with crf_model_path=output). The metadata
+    of the saved model records its cross-validation scores.
+    Returns the leaderboard, best first, and the phonemizer of the best configuration.
+    """
+    space = space or DEFAULT_SPACE
+    if search == "grid":
+        configs = grid_configs(space)
+    elif search == "random":
+        configs = random_configs(space, trials, seed)
+    else:
+        raise ValueError(f"unknown search: {search}, use 'grid' or 'random'")
+    registry = registry or ModelRegistry()
+    leaderboard = cross_validate(engine, configs, folds, jobs, seed, registry)
+
+    best = leaderboard[0]
+    config = {**best["config"], "strategy": AlignmentStrategy(best["config"]["strategy"])}
+    phonemizer = _resolve_engine(engine)(model_registry=registry, **config)
+    if output:
+        phonemizer.model_metadata["cross_validation"] = {"folds": folds, "seed": seed, "configs": len(leaderboard),
+                                                         **{k: v for k, v in best.items() if k != "config"}}
+        phonemizer.save_model(output)
+    return leaderboard, phonemizer
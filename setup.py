@@ -56,6 +56,11 @@ setup(
     include_package_data=True,
     package_data={'': extra_files},
     install_requires=required('requirements.txt'),
+    entry_points={
+        'console_scripts': [
+            'mwl-phonemizer=mwl_phonemizer.cli:main'
+        ]
+    },
     url='https://github.com/TigreGotico/mwl_phonemizer',
     license='',
     author='JarbasAi',
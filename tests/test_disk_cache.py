@@ -0,0 +1,15 @@
+from mwl_phonemizer.cache import DiskWordCache
+
+
+def test_prunes_every_n_inserts(tmp_path):
+    cache = DiskWordCache(str(tmp_path / "words.sqlite"), max_entries=10, prune_every=5)
+    for i in range(5):
+        cache.put_many("fp", {f"w{i}{j}": "x" for j in range(3)})
+    # pruned back to 10 after the 4th batch, the 5th waits for the next check
+    assert len(cache) == 13
+    cache.prune()
+    assert len(cache) == 10
+    words = [f"w{i}{j}" for i in range(5) for j in range(3)]
+    cached = cache.get_many("fp", words)
+    assert not any(f"w0{j}" in cached for j in range(3))
+    assert all(f"w4{j}" in cached for j in range(3))
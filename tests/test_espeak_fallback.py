@@ -0,0 +1,26 @@
+from mwl_phonemizer.espeak_mwl import EspeakError, _EspeakPhonemizer
+
+
+class FlakyPool:
+    def __init__(self, failures: int):
+        self.failures = failures
+
+    def phonemize_lines(self, lines, lang="pt"):
+        if self.failures:
+            self.failures -= 1
+            raise EspeakError("espeak-ng process died")
+        return [f"worker:{line}" for line in lines]
+
+
+def test_worker_failure_only_falls_back_until_the_retry(monkeypatch):
+    monkeypatch.setattr(_EspeakPhonemizer, "_run_espeak_command",
+                        staticmethod(lambda args, input_text=None, check=True: f"subprocess:{input_text}"))
+    pho = _EspeakPhonemizer(backend="worker")
+    pho._resolved = True
+    pho.pool = FlakyPool(failures=1)
+
+    assert pho.phonemize_many(["a"]) == ["subprocess:a"]
+    assert pho.phonemize_many(["b"]) == ["subprocess:b"]  # still backing off
+    pho.POOL_RETRY_SECONDS = 0
+    assert pho.phonemize_many(["c"]) == ["worker:c"]
+    assert pho.pool is not None
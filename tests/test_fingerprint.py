@@ -0,0 +1,28 @@
+from mwl_phonemizer.epitran_mwl import EpitranMWL
+from mwl_phonemizer.espeak_mwl import EspeakMWL
+
+
+def test_espeak_version_changes_the_fingerprint(monkeypatch):
+    pho = EspeakMWL()
+    monkeypatch.setattr(pho.pho, "version", lambda: "library 1.51")
+    before = pho.fingerprint()
+    monkeypatch.setattr(pho.pho, "version", lambda: "library 1.52")
+    upgraded = pho.fingerprint()
+    monkeypatch.setattr(pho.pho, "version", lambda: "subprocess 1.52")
+    assert len({before, upgraded, pho.fingerprint()}) == 3
+
+
+def test_epitran_version_and_backend_change_the_fingerprint(monkeypatch):
+    pho = EpitranMWL()
+    before = pho.fingerprint()
+    monkeypatch.setattr(pho.pho, "version", "0.0")
+    upgraded = pho.fingerprint()
+    assert upgraded != before
+    assert EpitranMWL(use_transducer=False).fingerprint() not in (before, upgraded)
+
+
+def test_epitran_table_changes_the_fingerprint(tmp_path):
+    pho = EpitranMWL()
+    path = str(tmp_path / "table.json")
+    pho.pho.save_table(path, ["lhéngua"])
+    assert EpitranMWL(epitran_table=path).fingerprint() != pho.fingerprint()
@@ -0,0 +1,47 @@
+import random
+
+from mwl_phonemizer.char_lookup_mwl import LookupTableMWL
+
+# LookupTableMWL before normalization was sped up, frozen here as the reference
+REFERENCE_DIMAP = {"an": "A", "en": "E", "in": "I", "on": "O", "un": "U", "rr": "R", "ss": "S", "lh": "ʎ",
+                   "nh": "ɲ", "qu": "Q", "gu": "G", "gue": "G", "Ge": "G", "ce": "Ç", "ci": "C", "uo": "W",
+                   "çc": "Z", "ge": "ʒɨ"}
+
+
+def reference_normalize(sentence: str) -> str:
+    sentence = (sentence.lower()
+                .replace("\t", " ")
+                .replace("-", " ")
+                .replace(",", " ")
+                .replace(";", " ")
+                .replace(".", ".")
+                .replace("!", ".")
+                .replace("?", "."))
+    for di, n in REFERENCE_DIMAP.items():
+        sentence = sentence.replace(di, n)
+    return sentence
+
+
+def reference_phonemize(word: str) -> str:
+    phonemes = ""
+    for char in reference_normalize(word):
+        phonemes += LookupTableMWL.LETTERS[char][0] if char in LookupTableMWL.LETTERS else char
+    return phonemes
+
+
+def texts() -> list[str]:
+    rnd = random.Random(0)
+    letters = "anuoqgcçrslhiedtmpbxzANUOGÇ-,;!?\t. "
+    return list(LookupTableMWL().GOLD) + ["".join(rnd.choice(letters) for _ in range(rnd.randint(1, 12)))
+                                          for _ in range(50000)]
+
+
+def test_normalize_matches_the_replace_chain():
+    mismatches = [t for t in texts() if LookupTableMWL.normalize(t) != reference_normalize(t)]
+    assert not mismatches[:10]
+
+
+def test_phonemize_matches_the_letter_loop():
+    pho = LookupTableMWL()
+    mismatches = [t for t in texts() if pho.phonemize(t, lookup_word=False) != reference_phonemize(t)]
+    assert not mismatches[:10]
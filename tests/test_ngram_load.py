@@ -0,0 +1,14 @@
+from mwl_phonemizer.ngram_mwl import NgramMWLPhonemizer, _MappedTable
+
+
+def test_loaded_model_matches_the_trained_one(tmp_path):
+    trained = NgramMWLPhonemizer()
+    path = str(tmp_path / "ngram.bin")
+    trained.save(path)
+    loaded = NgramMWLPhonemizer(model_path=path)
+
+    assert all(isinstance(table, _MappedTable) for table in loaded.tables)
+    words = list(trained.GOLD) + ["xyzzy", "lhéngua", "l", "çcq"]
+    expected = [trained.phonemize(word) for word in words]
+    assert [loaded.phonemize(word) for word in words] == expected
+    assert loaded.phonemize_many(words) == expected
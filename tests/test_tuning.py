@@ -0,0 +1,11 @@
+import os
+
+from mwl_phonemizer.model_registry import ModelRegistry
+from mwl_phonemizer.tuning import cross_validate
+
+
+def test_cross_validation_trains_no_default_model(tmp_path):
+    leaderboard = cross_validate("CRFOrthoCorrector", [{"max_iterations": 5}], folds=2, jobs=1,
+                                 registry=ModelRegistry(str(tmp_path)))
+    assert len(leaderboard) == 1
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".crfsuite")]
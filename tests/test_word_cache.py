@@ -0,0 +1,55 @@
+import json
+
+from mwl_phonemizer.cache import WordCache
+from mwl_phonemizer.crf_mwl import CRFPhonemizer
+from mwl_phonemizer.orthography_hand_rules import OrthographyRulesMWL
+
+
+def test_gold_dicts_do_not_collide(tmp_path):
+    custom = tmp_path / "custom.json"
+    custom.write_text(json.dumps({"lhéngua": "XXX"}), encoding="utf-8")
+    cache = WordCache(100)
+    default = OrthographyRulesMWL(word_cache=cache)
+    other = OrthographyRulesMWL(gold_dict=str(custom), word_cache=cache)
+
+    assert default.phonemize_words(["lhéngua"]) == [default.GOLD["lhéngua"]]
+    assert other.phonemize_words(["lhéngua"]) == ["XXX"]
+    assert default.fingerprint() != other.fingerprint()
+
+
+def test_models_do_not_collide():
+    cache = WordCache(100)
+    pairs = [("ab", "ab"), ("ba", "ba"), ("aab", "aab")]
+    same = CRFPhonemizer(train_data=list(pairs), use_model_registry=False, word_cache=cache)
+    swapped = CRFPhonemizer(train_data=[(x, y.translate(str.maketrans("ab", "ba"))) for x, y in pairs],
+                            use_model_registry=False, word_cache=cache)
+
+    expected = [same.phonemize("abba", lookup_word=False), swapped.phonemize("abba", lookup_word=False)]
+    assert expected[0] != expected[1]
+    assert same.phonemize_words(["abba"]) + swapped.phonemize_words(["abba"]) == expected
+
+
+def test_fingerprint_follows_the_model():
+    pho = CRFPhonemizer(train_data=[("ab", "ab")], use_model_registry=False)
+    before = pho.fingerprint()
+    pho.train_crf([("ab", "ba")])
+    assert pho.fingerprint() != before
+
+
+def test_words_are_cached_lowercased():
+    cache = WordCache(100)
+    pho = OrthographyRulesMWL(word_cache=cache)
+
+    assert pho.phonemize_words(["Mirandés", "mirandés", "MIRANDÉS"]) == [pho.phonemize("mirandés")] * 3
+    assert len(cache) == 1
+
+
+def test_single_words_are_served_from_the_cache():
+    cache = WordCache(100)
+    pho = CRFPhonemizer(train_data=[("ab", "ab"), ("ba", "ba")], use_model_registry=False, word_cache=cache)
+    expected = pho.phonemize("abba")
+    assert len(cache) == 1
+
+    pho.tagger = None  # a cache miss would tag the word again
+    assert pho.phonemize("Abba") == expected
+    assert pho.phonemize("abba", lookup_word=True) == expected